@@ -0,0 +1,171 @@
+"""Stand-in for sounddevice, playing into virtual devices instead of PortAudio.
+
+Put the directory of this file in front of sys.path (or PYTHONPATH) to use it. Streams call
+their callback from a thread at the pace of the samplerate times SPEED and record the
+blocks they produced with the time they would have reached the device.
+"""
+
+import os
+import threading
+import time
+import typing
+
+import numpy
+
+SPEED = float(os.environ.get("FAKE_AUDIO_SPEED", "1"))  # 1 is real time
+LATENCY = 0.01  # seconds from the callback until a block reaches the device
+DEVICES = (
+    {"name": "Virtual Microphone", "hostapi": 0, "max_input_channels": 2,
+     "max_output_channels": 0, "default_samplerate": 48000.0},
+    {"name": "Virtual Speakers", "hostapi": 0, "max_input_channels": 0,
+     "max_output_channels": 2, "default_samplerate": 48000.0},
+    {"name": "Virtual Cable", "hostapi": 0, "max_input_channels": 0,
+     "max_output_channels": 2, "default_samplerate": 44100.0}
+)
+
+
+class PortAudioError(Exception):
+    """Error of the virtual devices."""
+
+
+class CallbackFlags:
+    """Status of a callback, the virtual devices never under- or overflow."""
+    input_underflow = False
+    input_overflow = False
+    output_underflow = False
+    output_overflow = False
+    priming_output = False
+
+    def __bool__(self) -> bool:
+        """Whether any flag is set."""
+        return False
+
+
+class DeviceList(tuple):
+    """List of devices."""
+
+
+class TimeInfo(typing.NamedTuple):
+    """Timestamps of a callback, on the clock of time.perf_counter."""
+    inputBufferAdcTime: float  # pylint: disable=invalid-name
+    currentTime: float  # pylint: disable=invalid-name
+    outputBufferDacTime: float  # pylint: disable=invalid-name
+
+
+class _Default:
+    """Default devices."""
+    device = (0, 1)
+
+
+default = _Default()
+streams: list["OutputStream"] = []  # all open streams, for inspection
+
+
+def query_devices(device: typing.Optional[int] = None,
+                  kind: typing.Optional[str] = None) -> typing.Any:
+    """Get all devices or one device."""
+    devices = DeviceList(dict(info, index=index) for index, info in enumerate(DEVICES))
+    if device is None and kind is None:
+        return devices
+    if device is None:
+        device = default.device[kind == "output"]
+    return devices[device]
+
+
+def query_hostapis(index: typing.Optional[int] = None) -> typing.Any:
+    """Get all host apis or one host api."""
+    hostapis = ({"name": "Virtual", "devices": list(range(len(DEVICES))),
+                 "default_input_device": 0, "default_output_device": 1},)
+    return hostapis if index is None else hostapis[index]
+
+
+def _initialize() -> None:
+    """Nothing to initialize."""
+
+
+def _terminate() -> None:
+    """Nothing to terminate."""
+
+
+class OutputStream:
+    """Output stream to a virtual device."""
+
+    def __init__(self, device: typing.Any = None, samplerate: float = 48000.0,
+                 channels: typing.Any = 2, dtype: typing.Any = "float32",
+                 blocksize: int = 512, callback: typing.Optional[typing.Callable] = None,
+                 **_: typing.Any) -> None:
+        """Initialize the stream, the arguments match sounddevice."""
+        self.device = device
+        self.samplerate = samplerate
+        self.channels = channels if isinstance(channels, int) else channels[1]
+        self.dtype = dtype if isinstance(dtype, str) else dtype[1]
+        self.blocksize = blocksize or 512
+        self.callback = callback
+        self.recorded: list[tuple[float, numpy.ndarray]] = []  # device time and block
+        self.record = True
+        self.blocks = 0
+        self._running = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start calling the callback."""
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="fake-audio")
+        self._thread.start()
+        streams.append(self)
+
+    def stop(self) -> None:
+        """Stop calling the callback."""
+        self._running.clear()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        if self in streams:
+            streams.remove(self)
+
+    close = stop
+
+    def __enter__(self) -> "OutputStream":
+        """Start the stream."""
+        self.start()
+        return self
+
+    def __exit__(self, *_: typing.Any) -> None:
+        """Stop the stream."""
+        self.stop()
+
+    def pump(self) -> None:
+        """Produce one block."""
+        outdata = numpy.zeros((self.blocksize, self.channels), dtype=self.dtype)
+        now = time.perf_counter()
+        self._call(outdata, TimeInfo(now, now, now + LATENCY))
+        self.blocks += 1
+        if self.record:
+            self.recorded.append((now + LATENCY, outdata))
+
+    def _call(self, outdata: numpy.ndarray, time_info: TimeInfo) -> None:
+        """Call the callback."""
+        assert self.callback is not None
+        self.callback(outdata, len(outdata), time_info, CallbackFlags())
+
+    def _run(self) -> None:
+        """Produce blocks at the pace of the device."""
+        period = self.blocksize / self.samplerate / SPEED if SPEED > 0 else 0.0
+        deadline = time.perf_counter()
+        while self._running.is_set():
+            self.pump()
+            deadline += period
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                deadline = time.perf_counter()  # fell behind, like an underflowing device
+
+
+class Stream(OutputStream):
+    """Duplex stream from a silent virtual input to a virtual output."""
+
+    def _call(self, outdata: numpy.ndarray, time_info: TimeInfo) -> None:
+        """Call the callback with silent input."""
+        assert self.callback is not None
+        self.callback(numpy.zeros_like(outdata), outdata, len(outdata), time_info,
+                      CallbackFlags())
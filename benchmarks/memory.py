@@ -0,0 +1,67 @@
+"""Resident memory of the decoded sound library per sample format."""
+
+import json
+import pathlib
+import resource
+import subprocess
+import sys
+
+import soundfile
+
+AUDIO_PATH = "audio/"
+SCALE = 100
+FORMATS = ("float64", "float32", "int16")
+
+
+def resident() -> int:
+    """Get the peak resident memory of this process.
+
+    Returns:
+        The peak resident set size in KiB.
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage // 1024 if sys.platform == "darwin" else usage
+
+
+def measure(dtype: str, scale: int) -> dict[str, int]:
+    """Decode every sound file scale times and keep the results.
+
+    Arguments:
+        - dtype: sample format to decode to.
+        - scale: how often the library is decoded.
+
+    Returns:
+        Peak resident memory before and after and the bytes of audio data.
+    """
+    files = []
+    for file in sorted(pathlib.Path(AUDIO_PATH).iterdir()):
+        try:
+            soundfile.info(str(file))
+            soundfile.read(file, frames=1)
+        except soundfile.LibsndfileError:
+            continue
+        files.append(file)
+    before = resident()
+    library = [soundfile.read(file, dtype=dtype, always_2d=True)[0]
+               for _ in range(scale) for file in files]
+    return {"before_kib": before, "after_kib": resident(),
+            "data_bytes": sum(data.nbytes for data in library)}
+
+
+def main() -> None:
+    """Measure every sample format in a fresh process and print the results as JSON."""
+    if len(sys.argv) == 3:
+        print(json.dumps(measure(sys.argv[1], int(sys.argv[2]))))
+        return
+    results = {}
+    for dtype in FORMATS:
+        output = subprocess.run([sys.executable, __file__, dtype, str(SCALE)], check=True,
+                                capture_output=True, text=True).stdout
+        result = json.loads(output)
+        result["resident_kib"] = result["after_kib"] - result["before_kib"]
+        results[dtype] = result
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Time to the first frame of the app, measured headless against a budget."""
+
+import asyncio
+import json
+import pathlib
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+RUNS = 5
+BUDGET = 2.0  # seconds from starting the interpreter to the first frame
+SIZE = (120, 40)
+
+
+async def first_frame() -> None:
+    """Run the app headless and report the first frame on stdout."""
+    sys.path.insert(0, str(ROOT))
+    start = time.perf_counter()
+    import ui  # pylint: disable=import-outside-toplevel
+    imported = time.perf_counter() - start
+    app = ui.SoundboardApp()
+    async with app.run_test(size=SIZE) as pilot:
+        await pilot.pause()
+        print(json.dumps({"imports": imported}), flush=True)
+
+
+def measure() -> dict[str, float]:
+    """Start the app in a fresh interpreter and wait for its first frame.
+
+    Returns:
+        Seconds importing the ui and until the first frame.
+    """
+    start = time.perf_counter()
+    with subprocess.Popen([sys.executable, __file__, "--child"], cwd=ROOT, text=True,
+                          stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as child:
+        assert child.stdout is not None
+        line = child.stdout.readline()
+        frame = time.perf_counter() - start
+        child.kill()
+    if not line:
+        raise RuntimeError("the app exited before the first frame")
+    return {"imports": json.loads(line)["imports"], "first_frame": frame}
+
+
+def main() -> None:
+    """Measure the startup several times, print the results as JSON and check the budget."""
+    if sys.argv[1:] == ["--child"]:
+        asyncio.run(first_frame())
+        return
+    runs = [measure() for _ in range(RUNS)]
+    median = statistics.median(run["first_frame"] for run in runs)
+    print(json.dumps({"runs": runs, "median": median, "budget": BUDGET,
+                      "within_budget": median <= BUDGET}, indent=4))
+    sys.exit(median > BUDGET)
+
+
+if __name__ == "__main__":
+    main()
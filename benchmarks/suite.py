@@ -0,0 +1,361 @@
+"""Headless benchmark suite running against the virtual devices in benchmarks/fake."""
+
+import argparse
+import asyncio
+import json
+import multiprocessing.resource_tracker
+import os
+import pathlib
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+
+import numpy
+import soundfile
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+FAKE = pathlib.Path(__file__).resolve().parent / "fake"
+SIZE = (120, 40)
+SAMPLERATE = 44100
+FORMATS = {".wav": ("WAV", "PCM_16"), ".ogg": ("OGG", "VORBIS"),
+           ".mp3": ("MP3", "MPEG_LAYER_III")}
+DTYPES = ("float32", "int16")
+DECODE_SECONDS = 10.0
+DECODE_RUNS = 5
+VOICES = (1, 8, 32)
+MIX_BLOCKS = 2000
+TRIGGERS = 20
+POLICIES = ("overlap", "retrigger", "ignore", "queue")
+SPAM_PRESSES = 50
+SPAM_INTERVAL = 0.01  # seconds between presses
+CLIP_COUNTS = (10, 1000, 10000)
+TIMEOUT = 10.0  # seconds to wait for audio before giving up
+BENCHMARKS = ("decode", "mixer", "playback", "compose", "startup")
+
+
+def generate(path: pathlib.Path, seconds: float, channels: int = 2) -> None:
+    """Write a clip of decaying noise.
+
+    Arguments:
+        - path: path of the clip, the suffix selects the format.
+        - seconds: duration of the clip.
+        - channels: number of channels.
+    """
+    frames = int(seconds * SAMPLERATE)
+    envelope = numpy.exp(-numpy.linspace(0.0, 5.0, frames, dtype=numpy.float32))
+    noise = numpy.random.default_rng(0).uniform(-0.5, 0.5, (frames, channels))
+    file_format, subtype = FORMATS[path.suffix]
+    soundfile.write(path, (noise * envelope[:, None]).astype(numpy.float32), SAMPLERATE,
+                    subtype=subtype, format=file_format)
+
+
+def workspace(directory: pathlib.Path, clips: typing.Iterable[str],
+              sounds: typing.Optional[dict[str, dict[str, typing.Any]]] = None,
+              seconds: float = 0.5) -> None:
+    """Set up a working directory for the app with generated clips and default settings.
+
+    Identical clips are copied instead of encoded again.
+
+    Arguments:
+        - directory: the working directory.
+        - clips: file names of the clips.
+        - sounds: the sound config.
+        - seconds: duration of every clip.
+    """
+    shutil.copytree(ROOT / "lang", directory / "lang")
+    (directory / "config").mkdir()
+    (directory / "config" / "config.json").write_text("{}", encoding="utf-8")
+    (directory / "config" / "sounds.json").write_text(json.dumps(sounds or {}),
+                                                      encoding="utf-8")
+    (directory / "audio").mkdir()
+    templates: dict[str, pathlib.Path] = {}
+    for clip in clips:
+        path = directory / "audio" / clip
+        template = templates.get(path.suffix)
+        if template is None:
+            generate(path, seconds)
+            templates[path.suffix] = path
+        else:
+            shutil.copyfile(template, path)
+
+
+def run_child(name: str, directory: pathlib.Path, *arguments: str) -> typing.Any:
+    """Run a benchmark in a fresh interpreter using the virtual devices.
+
+    Arguments:
+        - name: name of the benchmark.
+        - directory: working directory of the interpreter.
+        - *arguments: arguments of the benchmark.
+
+    Returns:
+        The result the benchmark printed as JSON.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join((str(FAKE), str(ROOT))))
+    output = subprocess.run([sys.executable, __file__, "--child", name, *arguments],
+                            cwd=directory, env=env, check=True, capture_output=True,
+                            text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    """Summarize durations.
+
+    Arguments:
+        - values: the durations in seconds.
+
+    Returns:
+        Median, 95th percentile and maximum in milliseconds.
+    """
+    if not values:
+        return {}
+    ordered = sorted(values)
+    return {"p50_ms": statistics.median(ordered) * 1000,
+            "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+            "max_ms": ordered[-1] * 1000}
+
+
+def decode() -> dict[str, typing.Any]:
+    """Decode a generated clip of every file format into every sample format.
+
+    Returns:
+        Seconds of audio decoded per second and milliseconds per decode by format and
+        sample format, with the conversion to 48 kHz.
+    """
+    import utils.resample  # pylint: disable=import-outside-toplevel
+    results: dict[str, typing.Any] = {}
+    for suffix in FORMATS:
+        path = pathlib.Path("audio", f"decode{suffix}")
+        generate(path, DECODE_SECONDS)
+        for dtype in DTYPES:
+            start = time.perf_counter()
+            for _ in range(DECODE_RUNS):
+                data, samplerate = soundfile.read(path, dtype=dtype, always_2d=True)
+            decoded = (time.perf_counter() - start) / DECODE_RUNS
+            start = time.perf_counter()
+            for _ in range(DECODE_RUNS):
+                utils.resample.convert(data, samplerate, 48000, 2, dtype=dtype)
+            converted = (time.perf_counter() - start) / DECODE_RUNS
+            results[f"{suffix[1:]}/{dtype}"] = {
+                "decode_ms": decoded * 1000, "decode_realtime": DECODE_SECONDS / decoded,
+                "convert_ms": converted * 1000, "convert_realtime": DECODE_SECONDS / converted}
+    return results
+
+
+def mixer() -> dict[str, typing.Any]:
+    """Mix blocks with a growing number of voices, measuring the cpu time of the mixing thread.
+
+    Returns:
+        Microseconds per block and per voice and the share of the real-time budget of a block
+        by sample format and number of voices.
+    """
+    import utils.mixer  # pylint: disable=import-outside-toplevel
+    frames = MIX_BLOCKS * utils.mixer.BLOCKSIZE
+    noise = numpy.random.default_rng(0).uniform(-0.5, 0.5, (frames, 2)).astype(numpy.float32)
+    budget = utils.mixer.BLOCKSIZE / 48000
+    results: dict[str, typing.Any] = {}
+    for dtype in DTYPES:
+        data = (noise * utils.mixer.INT16_SCALE).astype(numpy.int16) \
+            if dtype == "int16" else noise
+        for voices in VOICES:
+            mix = utils.mixer.Mixer(48000, 2, dtype)
+            for _ in range(voices):
+                mix.play(data, 0.5)
+            outdata = numpy.zeros((utils.mixer.BLOCKSIZE, 2), dtype=dtype)
+            start = time.thread_time()
+            for _ in range(MIX_BLOCKS):
+                outdata.fill(0)
+                mix.mix(outdata)
+            block = (time.thread_time() - start) / MIX_BLOCKS
+            results[f"{dtype}/{voices}"] = {"block_us": block * 1e6,
+                                            "voice_us": block / voices * 1e6,
+                                            "budget": block / budget}
+    return results
+
+
+async def playback() -> dict[str, typing.Any]:
+    """Press sound buttons in the running app and spam them, one clip per trigger policy.
+
+    Returns:
+        The trigger latency, from the press until the first audible block reaches the
+        virtual speakers, with the latency stages of the stats. And per policy the deepest
+        queues of the mixers and the scheduler while spamming and the time to drain them.
+    """
+    # pylint: disable=import-outside-toplevel,protected-access
+    import ui
+    import utils.stats
+    app = ui.SoundboardApp()
+    results: dict[str, typing.Any] = {}
+    async with app.run_test(size=SIZE) as pilot:
+        while app.scheduler is None or any(worker.group == "startup" and not worker.is_finished
+                                           for worker in app.workers):
+            if app.audio_error is not None:
+                raise app.audio_error
+            await pilot.pause(0.05)
+        scheduler = app.scheduler
+        speakers = app.engine.streams[0]
+        buttons = {button.file.name: button
+                   for button in app.screen.query_one("#buttons").buttons
+                   if button.file is not None}
+        latencies: list[float] = []
+        for _ in range(TRIGGERS):
+            scheduler.stop_all()
+            await pilot.pause(0.1)
+            speakers.recorded.clear()
+            start = time.perf_counter()
+            buttons["overlap.wav"].press()
+            while time.perf_counter() - start < TIMEOUT:
+                audible = [played for played, block in list(speakers.recorded) if block.any()]
+                if audible:
+                    latencies.append(audible[0] - start)
+                    break
+                await pilot.pause(0.001)
+        results["trigger"] = percentiles(latencies)
+        results["stages"] = {stage: summary["p50_ms"] for stage, summary in
+                             utils.stats.STATS.summary()["local"]["stages"].items()}
+        speakers.record = False
+        for policy in POLICIES:
+            scheduler.stop_all()
+            await pilot.pause(0.1)
+            name = f"{policy}.wav"
+            depth = {"pending": 0, "voices": 0, "playbacks": 0}
+            for _ in range(SPAM_PRESSES):
+                buttons[name].press()
+                await pilot.pause(SPAM_INTERVAL)
+                with scheduler._lock:
+                    playbacks = len(scheduler.playing(name))
+                depth["pending"] = max(depth["pending"], max(
+                    len(mix._pending) for mix in scheduler.mixers.values()))
+                depth["voices"] = max(depth["voices"], max(
+                    sum(voice is not None for voice in mix._voices)
+                    for mix in scheduler.mixers.values()))
+                depth["playbacks"] = max(depth["playbacks"], playbacks)
+            start = time.perf_counter()
+            while scheduler.is_playing(name) or scheduler.is_loading(name):
+                await pilot.pause(0.01)
+            results[policy] = dict(depth, drain_s=time.perf_counter() - start)
+    return results
+
+
+async def compose(clips: str) -> dict[str, typing.Any]:
+    """Start the app and wait until the soundboard shows all clips.
+
+    Arguments:
+        - clips: the expected number of clips.
+
+    Returns:
+        Seconds importing the ui, until the first frame and until the scanned clips are shown,
+        and the number of mounted buttons.
+    """
+    start = time.perf_counter()
+    import ui  # pylint: disable=import-outside-toplevel
+    imported = time.perf_counter() - start
+    app = ui.SoundboardApp()
+    async with app.run_test(size=SIZE) as pilot:
+        await pilot.pause()
+        frame = time.perf_counter() - start
+        while any(worker.group == "scan" and not worker.is_finished for worker in app.workers):
+            await pilot.pause(0.01)
+        await pilot.pause()
+        shown = time.perf_counter() - start
+        grid = app.screen.query_one("#buttons")
+        if len(grid.entries) != int(clips):
+            raise RuntimeError(f"expected {clips} clips, found {len(grid.entries)}")
+        return {"imports_s": imported, "first_frame_s": frame, "shown_s": shown,
+                "buttons": len(grid.buttons)}
+
+
+def startup() -> typing.Any:
+    """Run the startup benchmark.
+
+    Returns:
+        Its result.
+    """
+    env = dict(os.environ, PYTHONPATH=str(FAKE))
+    output = subprocess.run([sys.executable, str(ROOT / "benchmarks" / "startup.py")], cwd=ROOT,
+                            env=env, check=False, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def child(name: str, arguments: list[str]) -> None:
+    """Run one benchmark and print its result as JSON.
+
+    Arguments:
+        - name: name of the benchmark.
+        - arguments: arguments of the benchmark.
+    """
+    # the warm-up process pool needs the resource tracker started before the app runs
+    multiprocessing.resource_tracker.ensure_running()
+    if name == "decode":
+        result = decode()
+    elif name == "mixer":
+        result = mixer()
+    elif name == "playback":
+        result = asyncio.run(playback())
+    else:
+        result = asyncio.run(compose(*arguments))
+    print(json.dumps(result), flush=True)
+    os._exit(0)  # don't wait for the warm-up of the library
+
+
+def run(names: list[str]) -> dict[str, typing.Any]:
+    """Run benchmarks, every one in a fresh interpreter and working directory.
+
+    Arguments:
+        - names: names of the benchmarks.
+
+    Returns:
+        The results by name.
+    """
+    results: dict[str, typing.Any] = {}
+    for name in names:
+        if name == "startup":
+            results[name] = startup()
+        elif name == "compose":
+            results[name] = {}
+            for clips in CLIP_COUNTS:
+                with tempfile.TemporaryDirectory(prefix="dionysus-") as directory:
+                    workspace(pathlib.Path(directory),
+                              (f"clip{index:05}.wav" for index in range(clips)), seconds=0.05)
+                    results[name][clips] = {
+                        "cold": run_child(name, pathlib.Path(directory), str(clips)),
+                        "indexed": run_child(name, pathlib.Path(directory), str(clips))}
+        else:
+            with tempfile.TemporaryDirectory(prefix="dionysus-") as directory:
+                if name == "playback":
+                    workspace(pathlib.Path(directory), (f"{policy}.wav" for policy in POLICIES),
+                              {f"{policy}.wav": {"policy": policy} for policy in POLICIES})
+                else:
+                    workspace(pathlib.Path(directory), ())
+                results[name] = run_child(name, pathlib.Path(directory))
+    return results
+
+
+def main() -> None:
+    """Run the selected benchmarks and print the results as JSON."""
+    if sys.argv[1:2] == ["--child"]:
+        child(sys.argv[2], sys.argv[3:])
+        return
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("benchmarks", nargs="*", metavar="benchmark",
+                        help=f"benchmarks to run, all by default: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--output", help="file to write the results to")
+    args = parser.parse_args()
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    report = json.dumps({"time": time.time(), "python": platform.python_version(),
+                         "platform": platform.platform(),
+                         "speed": float(os.environ.get("FAKE_AUDIO_SPEED", "1")),
+                         "results": run(args.benchmarks or list(BENCHMARKS))}, indent=4)
+    if args.output:
+        pathlib.Path(args.output).write_text(report, encoding="utf-8")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
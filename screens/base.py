@@ -0,0 +1,42 @@
+"""Base screen."""
+
+import typing
+
+import textual.screen
+
+import utils.translate
+
+if typing.TYPE_CHECKING:
+    import ui
+
+
+class Screen(textual.screen.Screen):
+    """Screen whose title and binding descriptions are translation keys.
+
+    The title is translated when the screen is created and again when the language changes,
+    instead of at import. widgets.footer.Footer translates the binding descriptions.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the screen."""
+        super().__init__()
+        self.translate()
+
+    def on_mount(self) -> None:
+        """Follow language changes."""
+        self.app: ui.SoundboardApp
+        self.app.config_changed.subscribe(self, self.language_changed)
+
+    def language_changed(self, changed: set[str]) -> None:
+        """Translate again if the language changed.
+
+        Arguments:
+            - changed: names of the changed settings.
+        """
+        if "language" in changed:
+            self.translate()
+
+    def translate(self) -> None:
+        """Translate the title."""
+        if self.TITLE is not None:
+            self.title = utils.translate.Text.translatable(self.TITLE)
@@ -2,53 +2,51 @@
 
 import textual.app
 import textual.containers
-import textual.screen
-import textual.widgets
 
-import screens.soundboard
+import screens.base
 import utils.config
-import utils.translate
+import utils.library
+import widgets.footer
+import widgets.header
+import widgets.translated
 
 
-class HelpScreen(textual.screen.Screen):
+class HelpScreen(screens.base.Screen):
     """Class for the help screen."""
-    TITLE = utils.translate.Text.translatable("help.header")
+    TITLE = "help.header"
     BINDINGS = [
-        ("h", "close", utils.translate.Text.translatable("help.footer.close"))
+        ("h", "close", "help.footer.close")
     ]
 
     def action_close(self) -> None:
         """Handle close action."""
-        self.app.pop_screen()
-        self.app.push_screen(screens.soundboard.SoundboardScreen())
+        self.app.switch_screen("soundboard")
 
     def compose(self) -> textual.app.ComposeResult:
         """Compose the ui."""
-        yield textual.widgets.Header(show_clock=utils.config.CONFIG.show_clock)
+        yield widgets.header.Header()
         with textual.containers.Vertical(id="help"):
             with textual.containers.Vertical(classes="faq"):
-                yield textual.widgets.Static(utils.translate.Text.translatable(
-                    "help.file_question"), classes="title")
-                yield textual.widgets.Static(utils.translate.Text.translatable(
-                    "help.file_text", AUDIO_PATH=screens.soundboard.AUDIO_PATH), classes="text")
+                yield widgets.translated.Static("help.file_question", classes="title")
+                yield widgets.translated.Static("help.file_text", classes="text",
+                                                AUDIO_PATH=utils.library.AUDIO_PATH)
             with textual.containers.Vertical(classes="faq"):
-                yield textual.widgets.Static(utils.translate.Text.translatable(
-                    "help.icon_question"), classes="title")
-                yield textual.widgets.Static(utils.translate.Text.translatable(
-                    "help.icon_text", SOUNDS_PATH=utils.config.SOUNDS_PATH), classes="text")
+                yield widgets.translated.Static("help.icon_question", classes="title")
+                yield widgets.translated.Static("help.icon_text", classes="text",
+                                                SOUNDS_PATH=utils.config.SOUNDS_PATH)
             with textual.containers.Vertical(classes="faq"):
-                yield textual.widgets.Static(utils.translate.Text.translatable(
-                    "help.name_question"), classes="title")
-                yield textual.widgets.Static(utils.translate.Text.translatable(
-                    "help.name_text", SOUNDS_PATH=utils.config.SOUNDS_PATH), classes="text")
+                yield widgets.translated.Static("help.name_question", classes="title")
+                yield widgets.translated.Static("help.name_text", classes="text",
+                                                SOUNDS_PATH=utils.config.SOUNDS_PATH)
             with textual.containers.Vertical(classes="faq"):
-                yield textual.widgets.Static(utils.translate.Text.translatable(
-                    "help.sound_question"), classes="title")
-                yield textual.widgets.Static(utils.translate.Text.translatable(
-                    "help.sound_text"), classes="text")
+                yield widgets.translated.Static("help.sound_question", classes="title")
+                yield widgets.translated.Static("help.sound_text", classes="text")
             with textual.containers.Vertical(classes="faq"):
-                yield textual.widgets.Static(utils.translate.Text.translatable(
-                    "help.json_question", SOUNDS_PATH=utils.config.SOUNDS_PATH), classes="title")
-                yield textual.widgets.Static(utils.translate.Text.translatable(
-                    "help.json_text"), classes="text")
-        yield textual.widgets.Footer()
+                yield widgets.translated.Static("help.policy_question", classes="title")
+                yield widgets.translated.Static("help.policy_text", classes="text",
+                                                SOUNDS_PATH=utils.config.SOUNDS_PATH)
+            with textual.containers.Vertical(classes="faq"):
+                yield widgets.translated.Static("help.json_question", classes="title",
+                                                SOUNDS_PATH=utils.config.SOUNDS_PATH)
+                yield widgets.translated.Static("help.json_text", classes="text")
+        yield widgets.footer.Footer()
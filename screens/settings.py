@@ -8,9 +8,77 @@ import textual.containers
 import textual.screen
 import textual.widgets
 
-import screens.soundboard
+import screens.base
 import utils.config
+import utils.devices
 import utils.translate
+import widgets.footer
+import widgets.header
+import widgets.translated
+
+if typing.TYPE_CHECKING:
+    import ui
+
+
+def device_options(kind: utils.devices.Kind) -> list[tuple[str, utils.devices.DeviceRef]]:
+    """Get the options of a device select.
+
+    Arguments:
+        - kind: "input" or "output".
+
+    Returns:
+        Label and reference of every device of that kind.
+    """
+    return [(device.label, device.ref) for device in utils.devices.DEVICES.of_kind(kind)]
+
+
+def device_value(ref: typing.Optional[utils.devices.DeviceRef], kind: utils.devices.Kind) \
+        -> typing.Optional[utils.devices.DeviceRef]:
+    """Get the value of a device select.
+
+    Arguments:
+        - ref: the configured device, None for the default device.
+        - kind: "input" or "output".
+
+    Returns:
+        Reference of the device the configured one resolves to, None if it's gone and there
+        is no default device.
+    """
+    device = utils.devices.DEVICES.find(ref, kind)
+    return device.ref if device is not None else None
+
+
+def device_select(ref: typing.Optional[utils.devices.DeviceRef], kind: utils.devices.Kind,
+                  select_id: str) -> textual.widgets.Select[utils.devices.DeviceRef]:
+    """Create a device select, blank stands for the default device.
+
+    Arguments:
+        - ref: the configured device, None for the default device.
+        - kind: "input" or "output".
+        - select_id: id of the select.
+
+    Returns:
+        The select.
+    """
+    value = device_value(ref, kind)
+    return textual.widgets.Select(device_options(kind),
+                                  value=textual.widgets.Select.BLANK if value is None else value,
+                                  prompt=utils.translate.Text.translatable(
+                                      "settings.device.default"),
+                                  id=select_id, classes="config_option")
+
+
+def device_ref(value: typing.Any) -> typing.Optional[utils.devices.DeviceRef]:
+    """Get the configured device from the value of a device select.
+
+    Arguments:
+        - value: the value.
+
+    Returns:
+        The device, None for the default device if blank.
+    """
+    return None if value is textual.widgets.Select.BLANK \
+        else typing.cast(utils.devices.DeviceRef, value)
 
 
 class ExitScreen(textual.screen.ModalScreen):
@@ -40,14 +108,16 @@ class ExitScreen(textual.screen.ModalScreen):
         self.app.pop_screen()
 
 
-class SettingsScreen(textual.screen.Screen):
+class SettingsScreen(screens.base.Screen):
     """Class for the settings screen."""
-    TITLE = utils.translate.Text.translatable("settings.header")
+    TITLE = "settings.header"
     BINDINGS = [
-        ("s", "close", utils.translate.Text.translatable("settings.footer.close"))
+        ("s", "close", "settings.footer.close"),
+        ("r", "refresh", "settings.footer.refresh")
     ]
 
     audio_device_changed: bool
+    previous: dict[str, typing.Any]
 
     def compose(self) -> textual.app.ComposeResult:
         """Compose the ui."""
@@ -55,76 +125,87 @@ class SettingsScreen(textual.screen.Screen):
         for file in pathlib.Path("lang").iterdir():
             name: str = file.stem
             languages.append((name, name))
-        yield textual.widgets.Header(show_clock=utils.config.CONFIG.show_clock)
+        yield widgets.header.Header()
         with textual.containers.Grid(id="config"):
             with textual.containers.Center():
-                yield textual.widgets.Label(utils.translate.Text.translatable(
-                    "settings.language.title"), classes="config_label")
+                yield widgets.translated.Label("settings.language.title", classes="config_label")
             with textual.containers.Center():
                 yield textual.widgets.Select(languages, allow_blank=False,
                                              value=utils.config.CONFIG.language,
                                              id="language_select", classes="config_option")
             with textual.containers.Center():
-                yield textual.widgets.Label(utils.translate.Text.translatable(
-                    "settings.clock.title"), classes="config_label")
+                yield widgets.translated.Label("settings.clock.title", classes="config_label")
             with textual.containers.Center():
                 yield textual.widgets.Switch(value=utils.config.CONFIG.show_clock,
                                              id="clock_switch", classes="config_option")
             with textual.containers.Center():
-                yield textual.widgets.Label(utils.translate.Text.translatable(
-                    "settings.emoji.title"), classes="config_label")
+                yield widgets.translated.Label("settings.emoji.title", classes="config_label")
             with textual.containers.Center():
                 yield textual.widgets.Input(utils.config.CONFIG.default_emoji,
                                             id="emoji_input", classes="config_option")
             with textual.containers.Center():
-                yield textual.widgets.Label(utils.translate.Text.translatable(
-                    "settings.theme.title"), classes="config_label")
+                yield widgets.translated.Label("settings.theme.title", classes="config_label")
             with textual.containers.Center():
                 yield textual.widgets.Select([(theme, theme)
                                               for theme in self.app.available_themes],
                                              allow_blank=False, value=self.app.theme,
                                              id="theme_select", classes="config_option")
             with textual.containers.Center():
-                yield textual.widgets.Label(utils.translate.Text.translatable(
-                    "settings.input.title"), classes="config_label")
+                yield widgets.translated.Label("settings.input.title", classes="config_label")
             with textual.containers.Center():
-                yield textual.widgets.Select([(device[0], index) for index, device
-                                              in utils.config.get_input_devices().items()],
-                                             allow_blank=False,
-                                             value=utils.config.CONFIG.input_device,
-                                             id="input_select", classes="config_option")
+                yield device_select(utils.config.CONFIG.input_device, "input", "input_select")
             with textual.containers.Center():
-                yield textual.widgets.Label(utils.translate.Text.translatable(
-                    "settings.output.title"), classes="config_label")
+                yield widgets.translated.Label("settings.output.title", classes="config_label")
             with textual.containers.Center():
-                yield textual.widgets.Select([(device[0], index) for index, device
-                                              in utils.config.get_output_devices().items()],
-                                             allow_blank=False,
-                                             value=utils.config.CONFIG.output_device,
-                                             id="output_select", classes="config_option")
+                yield device_select(utils.config.CONFIG.output_device, "output", "output_select")
             with textual.containers.Center():
-                yield textual.widgets.Label(utils.translate.Text.translatable(
-                    "settings.virtual.title"), classes="config_label")
+                yield widgets.translated.Label("settings.virtual.title", classes="config_label")
             with textual.containers.Center():
-                yield textual.widgets.Select([(device[0], index) for index, device
-                                              in utils.config.get_output_devices().items()],
-                                             allow_blank=False,
-                                             value=utils.config.CONFIG.virtual_output_device,
-                                             id="virtual_select", classes="config_option")
-        yield textual.widgets.Footer()
+                yield device_select(utils.config.CONFIG.virtual_output_device, "output",
+                                    "virtual_select")
+        yield widgets.footer.Footer()
 
     def on_show(self) -> None:
         """Do stuff on show."""
         self.audio_device_changed: bool = False
+        self.previous = utils.config.CONFIG.model_dump()
 
     def action_close(self) -> None:
         """Handle close action."""
+        self.app: ui.SoundboardApp
         if self.audio_device_changed:
             self.app.push_screen(ExitScreen())
-        else:
-            utils.config.CONFIG.store()
-            self.app.pop_screen()
-            self.app.push_screen(screens.soundboard.SoundboardScreen())
+            return
+        changed = {name for name, value in utils.config.CONFIG.model_dump().items()
+                   if self.previous[name] != value}
+        if changed:
+            self.app.store_config_later()
+            if "language" in changed:
+                utils.translate.set_language(utils.config.CONFIG.language)
+            self.app.config_changed.publish(changed)
+        self.app.switch_screen("soundboard")
+
+    def action_refresh(self) -> None:
+        """Handle refresh action."""
+        self.app: ui.SoundboardApp
+        try:
+            self.app.engine.refresh_devices()
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self.app.notify(message=str(exc), title=utils.translate.Text.translatable(
+                "notify.warning"), severity="warning")
+        for select_id, kind, ref in (
+                ("#input_select", "input", utils.config.CONFIG.input_device),
+                ("#output_select", "output", utils.config.CONFIG.output_device),
+                ("#virtual_select", "output", utils.config.CONFIG.virtual_output_device)):
+            select: textual.widgets.Select[utils.devices.DeviceRef] = self.query_one(
+                select_id, textual.widgets.Select)
+            with select.prevent(textual.widgets.Select.Changed):
+                select.set_options(device_options(typing.cast(utils.devices.Kind, kind)))
+                value = device_value(ref, typing.cast(utils.devices.Kind, kind))
+                if value is None:
+                    select.clear()
+                else:
+                    select.value = value
 
     @textual.on(textual.widgets.Select.Changed, "#language_select")
     def choose_langauge(self, event: textual.widgets.Select.Changed) -> None:
@@ -157,18 +238,17 @@ class SettingsScreen(textual.screen.Screen):
         """Choose the input."""
         event.stop()
         self.audio_device_changed = True
-        utils.config.CONFIG.input_device = typing.cast(int, event.value)
+        utils.config.CONFIG.input_device = device_ref(event.value)
 
     @textual.on(textual.widgets.Select.Changed, "#output_select")
     def choose_output(self, event: textual.widgets.Select.Changed) -> None:
         """Choose the output."""
         event.stop()
         self.audio_device_changed = True
-        utils.config.CONFIG.output_device = typing.cast(int, event.value)
+        utils.config.CONFIG.output_device = device_ref(event.value)
 
     @textual.on(textual.widgets.Select.Changed, "#virtual_select")
     def choose_virtual(self, event: textual.widgets.Select.Changed) -> None:
         """Choose the virtual."""
         self.audio_device_changed = True
-        utils.config.CONFIG.virtual_output_device = typing.cast(
-            int, event.value)
+        utils.config.CONFIG.virtual_output_device = device_ref(event.value)
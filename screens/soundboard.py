@@ -1,49 +1,138 @@
 """Soundboard screen."""
 
 import pathlib
+
 import typing
 
 import textual.app
-import textual.containers
 import textual.css
-import textual.screen
-import textual.widgets
+import textual.worker
 
-import screens.settings
-import screens.help
+import screens.base
 import utils.config
+import utils.library
 import utils.translate
-import widgets.sound_button
+import utils.watcher
+import widgets.footer
+import widgets.header
+import widgets.sound_grid
+
+if typing.TYPE_CHECKING:
+    import ui
 
 
-FILE_TYPES = (".mp3", ".wav", ".ogg")
-AUDIO_PATH = "audio/"
+FILE_TYPES = utils.library.FILE_TYPES
+AUDIO_PATH = utils.library.AUDIO_PATH
+WATCH_INTERVAL = 1.0  # seconds between checks for changed sound files
 
 
-class SoundboardScreen(textual.screen.Screen):
+class SoundboardScreen(screens.base.Screen):
     """Class for the soundboard screen."""
-    TITLE = utils.translate.Text.translatable("soundboard.header")
+    TITLE = "soundboard.header"
     BINDINGS = [
-        ("q", "quit",
-         utils.translate.Text.translatable("soundboard.footer.quit")),
-        ("s", "settings",
-         utils.translate.Text.translatable("soundboard.footer.settings")),
-        ("h", "help",
-         utils.translate.Text.translatable("soundboard.footer.help")),
-        ("t", "toggle_text",
-         utils.translate.Text.translatable("soundboard.footer.toggle"))
+        ("q", "quit", "soundboard.footer.quit"),
+        ("s", "settings", "soundboard.footer.settings"),
+        ("h", "help", "soundboard.footer.help"),
+        ("t", "toggle_text", "soundboard.footer.toggle"),
+        ("i", "stats", "soundboard.footer.stats")
     ]
 
     state: int = 0
 
+    def __init__(self) -> None:
+        """Initialize the screen."""
+        super().__init__()
+        self.watcher: typing.Optional[utils.watcher.Watcher] = None  # created with the scan
+
     def compose(self) -> textual.app.ComposeResult:
         """Compose the ui."""
-        yield textual.widgets.Header(show_clock=utils.config.CONFIG.show_clock)
-        with textual.containers.ScrollableContainer(id="buttons"):
-            for entry in pathlib.Path(AUDIO_PATH).iterdir():
-                if entry.is_file() and entry.suffix in FILE_TYPES:
-                    yield widgets.sound_button.SoundButton(file=entry)
-        yield textual.widgets.Footer()
+        yield widgets.header.Header()
+        yield widgets.sound_grid.SoundGrid([], id="buttons")
+        yield widgets.footer.Footer()
+
+    def on_mount(self) -> None:
+        """Follow config changes, scan the library in the background and watch the sound files."""
+        self.app: ui.SoundboardApp
+        self.app.config_changed.subscribe(self, self.config_changed)
+        self.run_worker(self.load_entries, thread=True, group="scan")
+        self.set_interval(WATCH_INTERVAL, self.check_files)
+
+    def load_entries(self) -> None:
+        """Show the sound files of the scan shared with the warm-up, runs in a thread worker.
+
+        The watcher stats all sound files, so it's created here too, before the scan so no
+        change is missed.
+        """
+        self.watcher = utils.watcher.Watcher(AUDIO_PATH, utils.config.SOUNDS_PATH)
+        self.app.call_from_thread(self.show_entries, utils.library.LIBRARY.entries())
+
+    def config_changed(self, changed: set[str]) -> None:
+        """Relabel the buttons if the default emoji changed.
+
+        Arguments:
+            - changed: names of the changed settings.
+        """
+        if "default_emoji" in changed:
+            self.query_one("#buttons", widgets.sound_grid.SoundGrid).refresh_labels()
+
+    def check_files(self) -> None:
+        """Check for changed sound files or sound config in a thread worker, one at a time."""
+        if self.watcher is not None and not any(
+                worker.group == "watch" and not worker.is_finished for worker in self.workers):
+            self.run_worker(self.poll, thread=True, group="watch")
+
+    def poll(self) -> None:
+        """Reload the sound files or the sound config if they changed, runs in a thread worker."""
+        changed = typing.cast(utils.watcher.Watcher, self.watcher).changed()
+        if changed:
+            self.reload(changed)
+
+    def reload(self, changed: list[pathlib.Path]) -> None:
+        """Reload the sound config and rescan the library, runs in a thread worker.
+
+        New and changed sound files are warmed up after a rescan. If only the sound config
+        changed, just the buttons of changed sounds are relabeled.
+
+        Arguments:
+            - changed: the changed paths.
+        """
+        names: set[str] = set()
+        if pathlib.Path(utils.config.SOUNDS_PATH) in changed:
+            try:
+                update = utils.config.reload_sounds()
+            except (OSError, ValueError) as exc:  # missing while saved, invalid json
+                self.app.call_from_thread(self.app.notify, message=str(exc),
+                                          title=utils.config.SOUNDS_PATH, severity="error")
+            else:
+                names = update.changed
+                for name, error in update.errors.items():
+                    self.app.call_from_thread(self.app.notify, message=error,
+                                              title=f"{utils.config.SOUNDS_PATH}: {name}",
+                                              severity="error")
+        if pathlib.Path(AUDIO_PATH) in changed:
+            entries = utils.library.LIBRARY.scan()
+            self.app.call_from_thread(self.show_entries, entries)
+            # new and changed files are analysed, or they play without normalization
+            self.app.warm_up(textual.worker.get_current_worker().cancelled_event,
+                             [entry for entry in entries if entry.peak is None])
+        elif names:
+            self.app.call_from_thread(self.relabel, names)
+
+    def show_entries(self, entries: list[utils.library.Metadata]) -> None:
+        """Show the rescanned sound files.
+
+        Arguments:
+            - entries: metadata of the sound files.
+        """
+        self.query_one("#buttons", widgets.sound_grid.SoundGrid).set_entries(entries)
+
+    def relabel(self, names: set[str]) -> None:
+        """Relabel the buttons of sounds whose sound config changed.
+
+        Arguments:
+            - names: file names of the changed sounds.
+        """
+        self.query_one("#buttons", widgets.sound_grid.SoundGrid).relabel(names)
 
     def action_quit(self) -> None:
         """Handle quit action."""
@@ -51,29 +140,17 @@ class SoundboardScreen(textual.screen.Screen):
 
     def action_settings(self) -> None:
         """Handle settings action."""
-        self.app.pop_screen()
-        self.app.push_screen(screens.settings.SettingsScreen())
+        self.app.switch_screen("settings")
 
     def action_help(self) -> None:
         """Handle help action."""
-        self.app.pop_screen()
-        self.app.push_screen(screens.help.HelpScreen())
+        self.app.switch_screen("help")
+
+    def action_stats(self) -> None:
+        """Handle stats action."""
+        self.app.switch_screen("stats")
 
     def action_toggle_text(self) -> None:
         """Handle toggle_text action."""
-        container: textual.containers.ScrollableContainer = typing.cast(
-            textual.containers.ScrollableContainer, self.query_one("#buttons"))
         self.state = (self.state + 1) % 3
-        for button in self.query(".sound-button").results(
-                widgets.sound_button.SoundButton):
-            match self.state:
-                case 0:
-                    container.styles.grid_size_columns = 5
-                    button.label = f"{button.emoji}\n{button.text}"
-                case 1:
-                    container.styles.grid_size_columns = 10
-                    button.label = button.emoji
-                case 2:
-                    container.styles.grid_size_columns = 5
-                    button.label = button.text
-        self.app.refresh_css()
+        self.query_one("#buttons", widgets.sound_grid.SoundGrid).set_mode(self.state)
@@ -0,0 +1,74 @@
+"""Stats screen."""
+
+import typing
+
+import textual.app
+import textual.timer
+import textual.widgets
+
+import screens.base
+import utils.stats
+import utils.translate
+import widgets.footer
+import widgets.header
+
+REFRESH_INTERVAL = 0.5  # seconds between updates while shown
+COLUMNS = ("stats.mixer", "stats.stage", "stats.count", "stats.mean", "stats.p50", "stats.p95",
+           "stats.p99", "stats.max")
+
+
+class StatsScreen(screens.base.Screen):
+    """Class for the stats screen."""
+    TITLE = "stats.header"
+    BINDINGS = [
+        ("i", "close", "stats.footer.close"),
+        ("e", "export", "stats.footer.export")
+    ]
+
+    def __init__(self) -> None:
+        """Initialize the screen."""
+        super().__init__()
+        self.timer: typing.Optional[textual.timer.Timer] = None  # created on mount
+
+    def compose(self) -> textual.app.ComposeResult:
+        """Compose the ui."""
+        yield widgets.header.Header()
+        yield textual.widgets.DataTable(id="stats", cursor_type="none", zebra_stripes=True)
+        yield widgets.footer.Footer()
+
+    def on_mount(self) -> None:
+        """Update the stats while shown."""
+        self.timer = self.set_interval(REFRESH_INTERVAL, self.show_stats, pause=True)
+
+    def on_show(self) -> None:
+        """Do stuff on show."""
+        self.show_stats()
+        if self.timer is not None:
+            self.timer.resume()
+
+    def on_hide(self) -> None:
+        """Do stuff on hide."""
+        if self.timer is not None:
+            self.timer.pause()
+
+    def show_stats(self) -> None:
+        """Show the latency of every stage and the status counters of every mixer."""
+        table: textual.widgets.DataTable = self.query_one("#stats", textual.widgets.DataTable)
+        table.clear(columns=True)
+        table.add_columns(*(utils.translate.Text.translatable(column) for column in COLUMNS))
+        for name, stats in utils.stats.STATS.summary().items():
+            for stage, summary in stats["stages"].items():
+                table.add_row(name, stage, summary["count"],
+                              *(f"{summary[key]:.1f}" for key in
+                                ("mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")))
+            for flag, count in stats["status"].items():
+                table.add_row(name, flag, count)
+
+    def action_close(self) -> None:
+        """Handle close action."""
+        self.app.switch_screen("soundboard")
+
+    def action_export(self) -> None:
+        """Handle export action."""
+        path = utils.stats.STATS.export()
+        self.app.notify(utils.translate.Text.translatable("stats.exported", path=path))
@@ -0,0 +1,171 @@
+"""Textual ui of the soundboard."""
+
+import threading
+import typing
+
+import rich
+import textual.app
+import textual.signal
+import textual.timer
+import textual.worker
+
+import screens.help
+import screens.settings
+import screens.soundboard
+import screens.stats
+import utils.config
+import utils.engine
+import utils.library
+import utils.translate
+
+if typing.TYPE_CHECKING:
+    import utils.scheduler
+
+LISTED_ERRORS = 5  # sounds listed when the warm-up fails for some
+
+
+class SoundboardApp(textual.app.App):
+    """Class for the app."""
+    ENABLE_COMMAND_PALETTE = False
+    TITLE = "Dionysus"
+    CSS_PATH = "./config/style.tcss"
+    SCREENS = {
+        "soundboard": screens.soundboard.SoundboardScreen,
+        "settings": screens.settings.SettingsScreen,
+        "help": screens.help.HelpScreen,
+        "stats": screens.stats.StatsScreen
+    }
+    BINDINGS = [
+        ("x", "stop_all", "soundboard.footer.stop")
+    ]
+
+    def __init__(self) -> None:
+        """Initialize the soundboard app, the audio devices are opened after the first frame."""
+        super().__init__()
+        self.theme = utils.config.CONFIG.theme
+        self.engine = utils.engine.Engine(self.report_error)
+        self.audio_error: typing.Optional[Exception] = None
+        self.store_timer: typing.Optional[textual.timer.Timer] = None
+        self.config_changed: textual.signal.Signal[set[str]] = textual.signal.Signal(
+            self, "config_changed")
+
+    @property
+    def scheduler(self) -> "typing.Optional[utils.scheduler.Scheduler]":
+        """Scheduler of the audio engine, None until the audio devices are open."""
+        return self.engine.scheduler
+
+    def on_mount(self) -> None:
+        """Do stuff on mount."""
+        self.push_screen("soundboard")
+        self.call_after_refresh(self.run_worker, self.start_audio, thread=True, group="startup")
+
+    def start_audio(self) -> None:
+        """Open the audio devices and warm up the sound library, runs in a thread worker.
+
+        Probing the devices and importing numpy and sounddevice happens here so it doesn't
+        delay the first frame. The app exits if the devices can't be opened, but not if the
+        warm-up fails, sounds are decoded when played then. Quitting cancels the worker,
+        which stops the warm-up.
+        """
+        cancel = textual.worker.get_current_worker().cancelled_event
+        try:
+            self.engine.open()
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self.audio_error = exc
+            self.from_worker(cancel, self.exit, return_code=1)
+            return
+        self.warm_up(cancel)
+
+    def warm_up(self, cancel: threading.Event,
+                entries: typing.Optional[list[utils.library.Metadata]] = None) -> None:
+        """Warm up sound files showing the progress and notifying failures, runs in a worker.
+
+        Arguments:
+            - cancel: the cancelled event of the thread worker.
+            - entries: metadata of the sound files, the whole library by default.
+        """
+        try:
+            errors = self.engine.warm_up(lambda done, total: self.from_worker(
+                cancel, self.show_progress, done, total), cancel, entries)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self.from_worker(cancel, self.show_progress, 0, 0)
+            self.from_worker(cancel, self.notify, message=str(exc), severity="warning",
+                             title=utils.translate.Text.translatable("notify.warning"))
+            return
+        if errors:
+            self.from_worker(cancel, self.notify, severity="warning",
+                             title=utils.translate.Text.translatable("notify.warning"),
+                             message="\n".join([utils.translate.Text.translatable(
+                                 "soundboard.warmup_failed", count=len(errors)),
+                                 *(f"{name}: {error}" for name, error
+                                   in list(errors.items())[:LISTED_ERRORS]),
+                                 *(["…"] if len(errors) > LISTED_ERRORS else [])]))
+
+    def report_error(self, name: str, error: Exception) -> None:
+        """Notify an error of a sound that failed while playing, called from another thread.
+
+        Arguments:
+            - name: file name of the sound.
+            - error: the error.
+        """
+        try:
+            self.call_from_thread(self.notify, message=f"{name}: {error}", severity="warning",
+                                  title=utils.translate.Text.translatable("notify.warning"))
+        except RuntimeError:
+            pass  # the app isn't running
+
+    def from_worker(self, cancel: threading.Event, callback: typing.Callable[..., typing.Any],
+                    *args: typing.Any, **kwargs: typing.Any) -> None:
+        """Run a callback on the ui thread from a thread worker, unless the app stops.
+
+        Arguments:
+            - cancel: the cancelled event of the worker, set when the app stops.
+            - callback: the callback.
+            - *args: arguments of the callback.
+            - **kwargs: keyword arguments of the callback.
+        """
+        if cancel.is_set():
+            return
+        try:
+            self.call_from_thread(callback, *args, **kwargs)
+        except RuntimeError:
+            pass  # the app stopped meanwhile
+
+    def store_config_later(self) -> None:
+        """Store the config after a delay on the ui thread, further calls restart the delay."""
+        utils.config.CONFIG.store_later()
+        if self.store_timer is not None:
+            self.store_timer.stop()
+        self.store_timer = self.set_timer(utils.config.STORE_DELAY, utils.config.CONFIG.flush)
+
+    def action_stop_all(self) -> None:
+        """Handle stop_all action, on every screen."""
+        if self.scheduler is not None:
+            self.scheduler.stop_all()
+
+    def show_progress(self, done: int, total: int) -> None:
+        """Show the warm-up progress in the header.
+
+        Arguments:
+            - done: number of sounds that are ready.
+            - total: number of sounds.
+        """
+        self.sub_title = "" if done == total else utils.translate.Text.translatable(
+            "soundboard.warmup", done=done, total=total)
+
+
+def run_app() -> None:
+    """Run the soundboard app."""
+    app = SoundboardApp()
+    try:
+        app.run()
+    finally:
+        app.engine.close_streams()
+    if app.audio_error is not None:
+        print(app.audio_error)
+        rich.print(
+            f"[red]{utils.translate.Text.translatable('error.audio_devices')}")
+        utils.config.CONFIG.store_reset()
+    else:
+        utils.config.CONFIG.flush()
+        utils.library.LIBRARY.store()
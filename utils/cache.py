@@ -0,0 +1,189 @@
+"""Decoded audio cache."""
+
+import collections
+import concurrent.futures
+import pathlib
+import threading
+import typing
+
+import numpy
+import soundfile
+
+import utils.config
+import utils.resample
+import utils.store
+
+# samplerate and channels of a device, None for the format of the file
+Format = typing.Optional[tuple[int, int]]
+
+# libsndfile and numpy release the GIL, so threads decode in parallel
+DECODE_POOL = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="decode")
+
+
+class Entry(typing.NamedTuple):
+    """Cached decoded audio."""
+    signature: tuple[int, int]
+    data: numpy.ndarray
+    samplerate: int
+
+
+class DecodedCache:
+    """Process-wide LRU cache of decoded audio, invalidated by file mtime and size."""
+
+    def __init__(self, budget: int, dtype: str = "float32") -> None:
+        """Initialize the cache.
+
+        Arguments:
+            - budget: maximum number of bytes of decoded audio to keep.
+            - dtype: sample format to keep the audio in, "float32" or "int16".
+        """
+        self.budget = budget
+        self.dtype = dtype
+        self.size = 0
+        self._entries: collections.OrderedDict[tuple[str, Format], Entry] = \
+            collections.OrderedDict()
+        self._inflight: dict[tuple[str, tuple[Format, ...]],
+                             concurrent.futures.Future[list[numpy.ndarray]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, file: pathlib.Path, audio_format: Format = None) -> tuple[numpy.ndarray, int]:
+        """Get decoded audio, decoding the file only if it isn't cached or has changed.
+
+        Files missing in memory are memory-mapped from the on-disk store and only decoded
+        (and stored) if they aren't stored yet. Every device format gets its own converted
+        copy, so playback never has to resample.
+
+        Arguments:
+            - file: path of the sound file.
+            - audio_format: samplerate and channels to convert to, None to keep the format.
+
+        Returns:
+            The audio data and its samplerate.
+        """
+        signature = utils.store.signature(file)
+        entry = self.lookup(file, audio_format, signature)
+        if entry is not None:
+            return entry.data, entry.samplerate
+        data, samplerate = self.load(file, signature, audio_format)
+        data.flags.writeable = False  # shared between all plays
+        self.put((str(file), audio_format), Entry(signature, data, samplerate))
+        return data, samplerate
+
+    def lookup(self, file: pathlib.Path, audio_format: Format,
+               signature: typing.Optional[tuple[int, int]] = None) -> typing.Optional[Entry]:
+        """Get an entry if it is in memory and up to date.
+
+        Arguments:
+            - file: path of the sound file.
+            - audio_format: samplerate and channels to convert to, None to keep the format.
+            - signature: signature of the file, taken from the file if not given.
+
+        Returns:
+            The entry, None if it has to be loaded.
+        """
+        key = (str(file), audio_format)
+        signature = signature or utils.store.signature(file)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.signature != signature:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def submit(self, file: pathlib.Path, audio_formats: list[Format]) \
+            -> concurrent.futures.Future[list[numpy.ndarray]]:
+        """Get decoded audio in several formats from the decode pool.
+
+        Concurrent requests for the same file share one decode.
+
+        Arguments:
+            - file: path of the sound file.
+            - audio_formats: samplerate and channels to convert to, None to keep the format.
+
+        Returns:
+            A future of the audio data in every format, already done if all are cached.
+        """
+        signature = utils.store.signature(file)
+        entries = [self.lookup(file, audio_format, signature) for audio_format in audio_formats]
+        if all(entry is not None for entry in entries):
+            future: concurrent.futures.Future[list[numpy.ndarray]] = concurrent.futures.Future()
+            future.set_result([typing.cast(Entry, entry).data for entry in entries])
+            return future
+        key = (str(file), tuple(audio_formats))
+        with self._lock:
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                inflight = DECODE_POOL.submit(
+                    lambda: [self.get(file, audio_format)[0] for audio_format in audio_formats])
+                self._inflight[key] = inflight
+                inflight.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return inflight
+
+    def load(self, file: pathlib.Path, signature: tuple[int, int],
+             audio_format: Format) -> tuple[numpy.ndarray, int]:
+        """Load audio from the on-disk store, decoding or converting and storing it if necessary.
+
+        Arguments:
+            - file: path of the sound file.
+            - signature: modification time and size of the sound file.
+            - audio_format: samplerate and channels to convert to, None to keep the format.
+
+        Returns:
+            The audio data and its samplerate.
+        """
+        stored = utils.store.load(file, signature, audio_format)
+        if stored is not None and stored[0].dtype == self.dtype:
+            return stored
+        if audio_format is None:
+            data, samplerate = soundfile.read(file=file, dtype=self.dtype, always_2d=True)
+        else:
+            data, samplerate = self.get(file)
+            data = utils.resample.convert(data, samplerate, *audio_format, dtype=self.dtype)
+            samplerate = audio_format[0]
+        try:
+            utils.store.save(file, signature, data, samplerate, audio_format)
+        except OSError:
+            return data, samplerate  # store not writable, keep the decoded audio
+        return utils.store.load(file, signature, audio_format) or (data, samplerate)
+
+    def put(self, key: tuple[str, Format], entry: Entry) -> None:
+        """Add an entry and evict least recently used entries until within budget.
+
+        Arguments:
+            - key: key of the entry.
+            - entry: the entry to add.
+        """
+        with self._lock:
+            self._remove(key)
+            if entry.data.nbytes > self.budget:
+                return
+            self._entries[key] = entry
+            self.size += entry.data.nbytes
+            while self.size > self.budget:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, file: pathlib.Path) -> None:
+        """Remove a file from the cache.
+
+        Arguments:
+            - file: path of the sound file.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == str(file)]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _remove(self, key: tuple[str, Format]) -> None:
+        """Remove an entry, the lock must be held."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.data.nbytes
+
+
+CACHE = DecodedCache(utils.config.CONFIG.cache_size * 1024 * 1024,
+                     utils.config.CONFIG.sample_format)
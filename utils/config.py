@@ -1,41 +1,79 @@
 """Config util."""
 
+import os
 import pathlib
+import tempfile
 import typing
 
 import pydantic
 import pydantic_core
-import sounddevice
+
+import utils.devices
 
 CONFIG_PATH = "config/config.json"
 SOUNDS_PATH = "config/sounds.json"
+LOCAL = "local"  # output to the speakers or headphones
+VIRTUAL = "virtual"  # output to the virtual cable, with the microphone passed through
+STORE_DELAY = 2.0  # seconds changes are collected before the config is written
+
 
-default_in: int
-default_out: int
-default_in, default_out = typing.cast(
-    tuple[int, int], sounddevice.default.device)
+def write_atomic(path: str, text: str) -> None:
+    """Write a text file by replacing it atomically, so it is never left half-written.
 
+    Arguments:
+        - path: path of the file.
+        - text: the content.
+    """
+    target = pathlib.Path(path)
+    descriptor, temp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp, target)
+    except BaseException:
+        pathlib.Path(temp).unlink(missing_ok=True)
+        raise
 
-def get_input_devices() -> dict[int, tuple[str, int]]:
-    """Get all input devices."""
-    devices: sounddevice.DeviceList = typing.cast(
-        sounddevice.DeviceList, sounddevice.query_devices())
-    return {device["index"]: (device["name"], device["max_input_channels"])
-            for device in devices if device["max_output_channels"] == 0}
 
+class Route(pydantic.BaseModel):
+    """Route of sounds to an output."""
+    output: str  # LOCAL, VIRTUAL or the name of an additional output
+    gain: float = pydantic.Field(default=1.0, ge=0)  # linear
 
-def get_output_devices() -> dict[int, tuple[str, int]]:
-    """Get all input devices."""
-    devices: sounddevice.DeviceList = typing.cast(
-        sounddevice.DeviceList, sounddevice.query_devices())
-    return {device["index"]: (device["name"], device["max_output_channels"])
-            for device in devices if device["max_input_channels"] == 0}
+
+class Output(pydantic.BaseModel):
+    """Output device played by its own mixer and stream."""
+    device: typing.Optional[utils.devices.DeviceRef] = None  # None for the default device
+    # passes an input through to the output, like the microphone to the virtual output
+    passthrough: bool = False
+    input_device: typing.Optional[utils.devices.DeviceRef] = None
 
 
 class Sound(pydantic.BaseModel):
     """Sound representation."""
     text: typing.Optional[str] = None
     emoji: typing.Optional[str] = None  # trying to match emojis isn't worth it
+    policy: typing.Literal["overlap", "retrigger", "ignore", "queue"] = "overlap"
+    max_queue: int = pydantic.Field(default=4, ge=0)
+    choke_group: typing.Optional[str] = None
+    routes: typing.Optional[list[Route]] = None  # None for the default routes
+
+    @pydantic.field_validator("routes")
+    @classmethod
+    def check_routes(cls, routes: typing.Optional[list[Route]],
+                     info: pydantic.ValidationInfo) -> typing.Optional[list[Route]]:
+        """Check that routes are given and exist, against the outputs of the context."""
+        if routes is None:
+            return routes
+        if not routes:
+            raise ValueError("routes can't be empty, leave them out for the default routes")
+        outputs = (info.context or {}).get("outputs")
+        unknown = {route.output for route in routes} - outputs if outputs is not None else set()
+        if unknown:
+            raise ValueError(f"routes to unknown outputs: {', '.join(sorted(unknown))}")
+        return routes
 
 
 class Sounds(pydantic.RootModel):
@@ -45,8 +83,13 @@ class Sounds(pydantic.RootModel):
     @classmethod
     def load(cls) -> "Sounds":
         """Load the config from file."""
-        return Sounds.model_validate(pydantic_core.from_json(
-            pathlib.Path(SOUNDS_PATH).read_text(encoding="utf-8")))
+        return Sounds.model_validate(read_sounds(), context=sounds_context())
+
+
+class SoundsUpdate(typing.NamedTuple):
+    """Result of reloading the sound config."""
+    changed: set[str]  # file names of added, changed and removed sounds
+    errors: dict[str, str]  # validation errors by file name, the previous config is kept
 
 
 class Config(pydantic.BaseModel):
@@ -55,9 +98,54 @@ class Config(pydantic.BaseModel):
     show_clock: bool = False
     default_emoji: str = "🔊"
     theme: str = "textual-dark"
-    input_device: int = default_in
-    output_device: int = default_out
-    virtual_output_device: int = default_out
+    # devices are stored by name and host api, None for the default device
+    input_device: typing.Optional[utils.devices.DeviceRef] = None
+    output_device: typing.Optional[utils.devices.DeviceRef] = None
+    virtual_output_device: typing.Optional[utils.devices.DeviceRef] = None
+    cache_size: int = pydantic.Field(default=256, ge=0)  # in MiB
+    stream_threshold: float = pydantic.Field(default=30.0, ge=0)  # in seconds
+    sample_format: typing.Literal["float32", "int16"] = "float32"
+    # sounds are played at this loudness in LUFS, None to play them unchanged
+    loudness_target: typing.Optional[float] = pydantic.Field(default=-18.0, le=0)
+    outputs: dict[str, Output] = {}  # additional outputs by name
+    routes: list[Route] = [Route(output=LOCAL), Route(output=VIRTUAL)]  # of sounds by default
+
+    _pending: bool = pydantic.PrivateAttr(default=False)
+
+    @pydantic.field_validator("input_device", "output_device", "virtual_output_device",
+                              mode="before")
+    @classmethod
+    def migrate_device(cls, value: typing.Any) -> typing.Any:
+        """Migrate devices stored by index to references."""
+        if isinstance(value, int):
+            try:
+                return utils.devices.DEVICES.device(value).ref
+            except IndexError:
+                return None
+        return value
+
+    @pydantic.model_validator(mode="after")
+    def check_outputs(self) -> "Config":
+        """Check that additional outputs don't replace the built-in ones and routes exist."""
+        if {LOCAL, VIRTUAL} & self.outputs.keys():
+            raise ValueError(f"outputs can't be named {LOCAL!r} or {VIRTUAL!r}")
+        unknown = {route.output for route in self.routes} - self.output_table().keys()
+        if unknown:
+            raise ValueError(f"routes to unknown outputs: {', '.join(sorted(unknown))}")
+        if not self.routes:
+            raise ValueError("routes can't be empty")
+        return self
+
+    def output_table(self) -> dict[str, Output]:
+        """Get all outputs.
+
+        Returns:
+            The outputs by name, the local and virtual output first.
+        """
+        return {LOCAL: Output(device=self.output_device),
+                VIRTUAL: Output(device=self.virtual_output_device, passthrough=True,
+                                input_device=self.input_device),
+                **self.outputs}
 
     @classmethod
     def load(cls) -> "Config":
@@ -66,16 +154,98 @@ class Config(pydantic.BaseModel):
             pathlib.Path(CONFIG_PATH).read_text(encoding="utf-8")))
 
     def store(self) -> None:
-        """Store the config in a file."""
-        pathlib.Path(CONFIG_PATH).write_text(self.model_dump_json(),
-                                             encoding="utf-8")
+        """Store the config in a file, replacing a pending delayed store."""
+        self._pending = False
+        write_atomic(CONFIG_PATH, self.model_dump_json())
 
-    def store_reset(self) -> None:
-        """Store the config in a file and reset audio device selection by excluding them."""
-        pathlib.Path(CONFIG_PATH).write_text(self.model_dump_json(
-            exclude={"input_device", "output_device", "virtual_output_device"}),
-            encoding="utf-8")
+    def store_later(self) -> None:
+        """Store the config with the next flush.
 
+        The thread changing the config flushes it, after collecting changes for
+        STORE_DELAY, so the config is never written while it changes.
+        """
+        self._pending = True
 
-CONFIG = Config.load()
-SOUNDS = Sounds.load().root
+    def flush(self) -> None:
+        """Store the config now if a delayed store is pending."""
+        if self._pending:
+            self.store()
+
+    def store_reset(self) -> None:
+        """Store the config in a file and reset audio device selection by excluding them."""
+        self._pending = False
+        write_atomic(CONFIG_PATH, self.model_dump_json(
+            exclude={"input_device", "output_device", "virtual_output_device"}))
+
+
+CONFIG: Config  # loaded on first access
+SOUNDS: dict[str, Sound]
+_raw_sounds: dict[str, typing.Any] = {}  # entries of the sound config as last read
+
+
+def read_sounds() -> dict[str, typing.Any]:
+    """Read the sound config without validating it.
+
+    Returns:
+        The entries by file name.
+    """
+    raw = pydantic_core.from_json(pathlib.Path(SOUNDS_PATH).read_text(encoding="utf-8"))
+    if not isinstance(raw, dict):
+        raise ValueError(f"{SOUNDS_PATH} must contain an object")
+    return raw
+
+
+def sounds_context() -> dict[str, typing.Any]:
+    """Get the context validating sounds, with the outputs their routes can use.
+
+    Returns:
+        The context.
+    """
+    config: Config = globals()["CONFIG"] if "CONFIG" in globals() else __getattr__("CONFIG")
+    return {"outputs": config.output_table().keys()}
+
+
+def __getattr__(name: str) -> typing.Any:
+    """Load the config and the sounds on first access instead of at import."""
+    global CONFIG, SOUNDS, _raw_sounds  # pylint: disable=global-statement
+    if name == "CONFIG":
+        CONFIG = Config.load()
+        return CONFIG
+    if name == "SOUNDS":
+        _raw_sounds = read_sounds()
+        SOUNDS = Sounds.model_validate(_raw_sounds, context=sounds_context()).root
+        return SOUNDS
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def reload_sounds() -> SoundsUpdate:
+    """Reload the sounds from file, validating only the entries that changed.
+
+    The current sounds are kept if the file is invalid, as is the current config of an
+    invalid entry.
+
+    Returns:
+        The changed sounds and the errors of invalid entries.
+    """
+    global SOUNDS, _raw_sounds  # pylint: disable=global-statement
+    previous = _raw_sounds
+    raw = read_sounds()
+    sounds = dict(globals().get("SOUNDS", {}))
+    changed = {name for name in raw.keys() | previous.keys()
+               if raw.get(name) != previous.get(name)}
+    errors: dict[str, str] = {}
+    context = sounds_context()
+    for name in changed:
+        if name not in raw:
+            sounds.pop(name, None)
+            continue
+        try:
+            sounds[name] = Sound.model_validate(raw[name], context=context)
+        except pydantic.ValidationError as exc:
+            errors[name] = str(exc)
+            if name in previous:
+                raw[name] = previous[name]  # so fixing it again counts as a change
+            else:
+                del raw[name]
+    SOUNDS, _raw_sounds = sounds, raw
+    return SoundsUpdate(changed - errors.keys(), errors)
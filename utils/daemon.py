@@ -0,0 +1,260 @@
+"""Headless mode playing sounds triggered through a local socket."""
+
+import functools
+import os
+import pathlib
+import shlex
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+import typing
+
+import utils.config
+import utils.engine
+import utils.library
+import utils.watcher
+
+SOCKET_PATH = "cache/dionysus.sock"
+PORT = 47474  # on the loopback interface where there are no Unix sockets
+WATCH_INTERVAL = 1.0  # seconds between checks for changed sound files and sound config
+
+
+def resolve(name: str) -> pathlib.Path:
+    """Resolve the file name of a sound.
+
+    Arguments:
+        - name: file name of the sound in AUDIO_PATH.
+
+    Returns:
+        The path of the sound file.
+    """
+    file = pathlib.Path(utils.library.AUDIO_PATH, name)
+    if pathlib.Path(name).name != name or not name.endswith(utils.library.FILE_TYPES) \
+            or not file.is_file():
+        raise ValueError(f"unknown sound '{name}'")
+    return file
+
+
+def parse(line: str) -> list[list[str]]:
+    """Split a line into commands separated by semicolons.
+
+    Arguments:
+        - line: the line, arguments are quoted like in a shell.
+
+    Returns:
+        The commands as lists of the command name and its arguments.
+    """
+    lexer = shlex.shlex(line, posix=True, punctuation_chars=";")
+    lexer.whitespace_split = True
+    commands: list[list[str]] = [[]]
+    for token in lexer:
+        if set(token) == {";"}:
+            commands.append([])
+        else:
+            commands[-1].append(token)
+    return [command for command in commands if command]
+
+
+def report(future: typing.Any) -> None:
+    """Print the error of a trigger that failed after it was dispatched.
+
+    Arguments:
+        - future: the future of the playback.
+    """
+    if future.exception() is not None:
+        print(f"error: {future.exception()}", file=sys.stderr)
+
+
+class Dispatcher:
+    """Dispatcher of command lines to the scheduler of an engine.
+
+    Commands:
+        - play NAME...: trigger sounds according to their policy.
+        - stop NAME...: stop all playbacks of sounds.
+        - stop-all: stop everything.
+    A line can hold a batch of commands separated by semicolons, which are run in order
+    and stop at the first error. Every line is answered with "ok" or "error" and the reason,
+    as soon as the triggers are dispatched.
+    """
+
+    def __init__(self, engine: utils.engine.Engine) -> None:
+        """Initialize the dispatcher.
+
+        Arguments:
+            - engine: the opened engine.
+        """
+        self.engine = engine
+
+    def execute(self, line: str) -> str:
+        """Execute a line of commands.
+
+        Arguments:
+            - line: the line.
+
+        Returns:
+            The reply.
+        """
+        pressed = time.perf_counter()
+        scheduler = self.engine.scheduler
+        assert scheduler is not None
+        try:
+            for command, *arguments in parse(line):
+                if command == "play":
+                    for name in arguments:
+                        scheduler.trigger(resolve(name), pressed).add_done_callback(report)
+                elif command == "stop":
+                    for name in arguments:
+                        scheduler.stop(resolve(name))
+                elif command == "stop-all":
+                    scheduler.stop_all()
+                else:
+                    raise ValueError(f"unknown command '{command}'")
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            return f"error {exc}"
+        return "ok"
+
+
+class Handler(socketserver.StreamRequestHandler):
+    """Connection answering every line it receives."""
+    disable_nagle_algorithm = not hasattr(socket, "AF_UNIX")  # only for the tcp fallback
+
+    def __init__(self, dispatcher: Dispatcher, *args: typing.Any) -> None:
+        """Initialize the handler, which handles the connection right away.
+
+        Arguments:
+            - dispatcher: the dispatcher of the commands.
+            - args: arguments of socketserver.StreamRequestHandler.
+        """
+        self.dispatcher = dispatcher
+        super().__init__(*args)
+
+    def handle(self) -> None:
+        """Execute lines until the client disconnects."""
+        for line in self.rfile:
+            reply = self.dispatcher.execute(line.decode("utf-8", "replace").strip())
+            self.wfile.write(f"{reply}\n".encode("utf-8"))
+
+
+def listen(path: str, dispatcher: Dispatcher) -> socketserver.BaseServer:
+    """Listen on a Unix socket, or on a loopback port where there are none.
+
+    Arguments:
+        - path: path of the socket, replaced if no other instance is listening on it.
+        - dispatcher: the dispatcher of the commands.
+
+    Returns:
+        The server, serving a thread per connection.
+    """
+    handler = typing.cast(typing.Callable[..., socketserver.BaseRequestHandler],
+                          functools.partial(Handler, dispatcher))
+    server: socketserver.BaseServer
+    if not hasattr(socket, "AF_UNIX"):
+        server = socketserver.ThreadingTCPServer(("127.0.0.1", PORT), handler)
+        server.daemon_threads = True
+        return server
+    pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+    if os.path.exists(path):
+        with socket.socket(socket.AF_UNIX) as probe:
+            try:
+                probe.connect(path)
+            except OSError:
+                os.unlink(path)  # left behind by an instance that didn't exit cleanly
+            else:
+                raise RuntimeError(f"another instance is listening on {path}")
+    server = socketserver.ThreadingUnixStreamServer(path, handler)
+    server.daemon_threads = True
+    os.chmod(path, 0o600)
+    return server
+
+
+def watch(engine: utils.engine.Engine, cancel: threading.Event) -> None:
+    """Reload the sound config and rescan the sound files when they change, runs in a thread.
+
+    New and changed sound files are warmed up after a rescan.
+
+    Arguments:
+        - engine: the engine with open audio devices.
+        - cancel: set to stop watching, when the headless mode exits.
+    """
+    watcher = utils.watcher.Watcher(utils.config.SOUNDS_PATH, utils.library.AUDIO_PATH)
+    while not cancel.wait(WATCH_INTERVAL):
+        changed = watcher.changed()
+        if pathlib.Path(utils.config.SOUNDS_PATH) in changed:
+            try:
+                update = utils.config.reload_sounds()
+            except (OSError, ValueError) as exc:  # missing while saved, invalid json
+                print(f"error: {exc}", file=sys.stderr)
+            else:
+                for name, error in update.errors.items():
+                    print(f"error: {name}: {error}", file=sys.stderr)
+        if pathlib.Path(utils.library.AUDIO_PATH) in changed:
+            try:
+                entries = utils.library.LIBRARY.scan()
+                errors = engine.warm_up(lambda done, total: None, cancel,
+                                        [entry for entry in entries if entry.peak is None])
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                errors = {utils.library.AUDIO_PATH: str(exc)}
+            for name, error in errors.items():
+                print(f"error: {name}: {error}", file=sys.stderr)
+
+
+def warm_up(engine: utils.engine.Engine, cancel: threading.Event) -> None:
+    """Warm up the library and print "ready" when done, runs in a thread.
+
+    "ready" is also printed if the warm-up fails, sounds are decoded when played then.
+
+    Arguments:
+        - engine: the engine with open audio devices.
+        - cancel: set to stop early, when the headless mode exits.
+    """
+    try:
+        errors = engine.warm_up(lambda done, total: None, cancel)
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        print(f"error: warm-up failed: {exc}", file=sys.stderr)
+    else:
+        for name, error in errors.items():
+            print(f"error: {name}: {error}", file=sys.stderr)
+    if not cancel.is_set():
+        print("ready", flush=True)
+
+
+def run(path: str = SOCKET_PATH) -> None:
+    """Run the headless mode until interrupted or terminated.
+
+    The audio devices are opened and the library is warmed up in the background while
+    commands are already served.
+
+    Arguments:
+        - path: path of the socket.
+    """
+    engine = utils.engine.Engine(
+        lambda name, error: print(f"error: {name}: {error}", file=sys.stderr))
+    try:
+        engine.open()
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        print(f"error: can't open the audio devices: {exc}", file=sys.stderr)
+        sys.exit(1)
+    server = listen(path, Dispatcher(engine))
+    cancel = threading.Event()
+    warming = threading.Thread(target=warm_up, args=(engine, cancel), daemon=True,
+                               name="warm-up")
+    warming.start()
+    threading.Thread(target=watch, args=(engine, cancel), daemon=True, name="watch").start()
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"listening on {server.server_address}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cancel.set()
+        warming.join()  # sounds being decoded are finished, the others are cancelled
+        server.server_close()
+        if isinstance(server.server_address, str):
+            pathlib.Path(server.server_address).unlink(missing_ok=True)
+        engine.close_streams()
+        utils.config.CONFIG.flush()
+        utils.library.LIBRARY.store()
@@ -0,0 +1,183 @@
+"""Audio device registry."""
+
+import threading
+import typing
+
+import pydantic
+
+if typing.TYPE_CHECKING:
+    import sounddevice
+
+Kind = typing.Literal["input", "output"]
+
+
+class DeviceRef(pydantic.BaseModel, frozen=True):
+    """Stable reference to a device, indexes change when devices are added or removed."""
+    name: str
+    hostapi: str
+
+
+class Device(typing.NamedTuple):
+    """Audio device."""
+    index: int
+    name: str
+    hostapi: str
+    max_input_channels: int
+    max_output_channels: int
+    default_samplerate: float
+
+    @property
+    def ref(self) -> DeviceRef:
+        """Stable reference to the device."""
+        return DeviceRef(name=self.name, hostapi=self.hostapi)
+
+    @property
+    def label(self) -> str:
+        """Name of the device with its host api."""
+        return f"{self.name} ({self.hostapi})"
+
+    def channels(self, kind: Kind) -> int:
+        """Get the maximum number of channels.
+
+        Arguments:
+            - kind: "input" or "output".
+
+        Returns:
+            The maximum number of input or output channels.
+        """
+        return self.max_input_channels if kind == "input" else self.max_output_channels
+
+
+def reinitialize_portaudio() -> None:
+    """Terminate and initialize PortAudio again, so it enumerates the devices again.
+
+    sounddevice has no public function for this, PortAudio only enumerates devices in
+    Pa_Initialize. Its private wrappers are the known workaround, so they are checked for
+    to fail with a clear error if a sounddevice release drops them.
+    """
+    import sounddevice  # pylint: disable=import-outside-toplevel,redefined-outer-name
+    terminate = getattr(sounddevice, "_terminate", None)
+    initialize = getattr(sounddevice, "_initialize", None)
+    if terminate is None or initialize is None:
+        raise RuntimeError(f"sounddevice {sounddevice.__version__} can't reinitialize PortAudio")
+    terminate()
+    initialize()
+
+
+class Registry:
+    """Registry enumerating the devices once and resolving device references to indexes.
+
+    PortAudio only enumerates devices when it is initialized, so refreshing with
+    reinitialize closes all open streams and must only be done while none are open.
+    sounddevice is imported on first use, initializing PortAudio takes a while.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the registry."""
+        self._devices: typing.Optional[list[Device]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def devices(self) -> list[Device]:
+        """All devices, enumerated on first use."""
+        with self._lock:
+            if self._devices is None:
+                import sounddevice  # pylint: disable=import-outside-toplevel,redefined-outer-name
+                hostapis = [hostapi["name"] for hostapi in typing.cast(
+                    tuple[dict[str, typing.Any], ...], sounddevice.query_hostapis())]
+                self._devices = [
+                    Device(device["index"], device["name"], hostapis[device["hostapi"]],
+                           device["max_input_channels"], device["max_output_channels"],
+                           device["default_samplerate"])
+                    for device in typing.cast(sounddevice.DeviceList,
+                                              sounddevice.query_devices())]
+            return self._devices
+
+    def refresh(self, reinitialize: bool = False) -> None:
+        """Enumerate the devices again on next use.
+
+        Arguments:
+            - reinitialize: reinitialize PortAudio to find added and removed devices.
+        """
+        with self._lock:
+            if reinitialize:
+                reinitialize_portaudio()
+            self._devices = None
+
+    def of_kind(self, kind: Kind) -> list[Device]:
+        """Get the devices with input or output channels.
+
+        Arguments:
+            - kind: "input" or "output".
+
+        Returns:
+            The devices.
+        """
+        return [device for device in self.devices if device.channels(kind) > 0]
+
+    def device(self, index: int) -> Device:
+        """Get a device by index.
+
+        Arguments:
+            - index: index of the device.
+
+        Returns:
+            The device.
+        """
+        return self.devices[index]
+
+    def default(self, kind: Kind) -> int:
+        """Get the index of the default device, PortAudio may have none.
+
+        Arguments:
+            - kind: "input" or "output".
+
+        Returns:
+            The index, -1 if there is no default device.
+        """
+        import sounddevice  # pylint: disable=import-outside-toplevel,redefined-outer-name
+        return typing.cast(tuple[int, int], sounddevice.default.device)[kind == "output"]
+
+    def resolve(self, ref: typing.Optional[DeviceRef], kind: Kind) -> int:
+        """Resolve a device reference to the current index of the device.
+
+        A device with the same name on another host api is used if the host api is gone,
+        the default device if the device is gone.
+
+        Arguments:
+            - ref: the reference, None for the default device.
+            - kind: "input" or "output".
+
+        Returns:
+            The index of the device, a LookupError is raised if there is none.
+        """
+        if ref is not None:
+            devices = self.of_kind(kind)
+            for device in devices:
+                if device.ref == ref:
+                    return device.index
+            for device in devices:
+                if device.name == ref.name:
+                    return device.index
+        index = self.default(kind)
+        if index < 0:
+            raise LookupError(f"there is no {kind} device")
+        return index
+
+    def find(self, ref: typing.Optional[DeviceRef], kind: Kind) -> typing.Optional[Device]:
+        """Find the device a reference resolves to.
+
+        Arguments:
+            - ref: the reference, None for the default device.
+            - kind: "input" or "output".
+
+        Returns:
+            The device, None if there is no device of that kind.
+        """
+        try:
+            return self.device(self.resolve(ref, kind))
+        except LookupError:
+            return None
+
+
+DEVICES = Registry()
@@ -0,0 +1,116 @@
+"""Audio engine shared by the app and the headless mode."""
+
+import threading
+import typing
+
+import utils.config
+import utils.devices
+import utils.library
+
+if typing.TYPE_CHECKING:
+    import utils.mixer
+    import utils.scheduler
+
+
+class Engine:
+    """One mixer and long-lived stream per output and the scheduler playing on them.
+
+    numpy and sounddevice are imported when the engine is opened, not with this module.
+    """
+
+    def __init__(self,
+                 report: typing.Optional[typing.Callable[[str, Exception], None]] = None) \
+            -> None:
+        """Initialize the engine.
+
+        Arguments:
+            - report: called with the file name and the error when a streamed sound fails
+              while playing, from its reader thread.
+        """
+        self.report = report
+        self.mixers: dict[str, utils.mixer.Mixer] = {}  # by output name
+        self.streams: list[utils.mixer.Stream] = []
+        self.scheduler: typing.Optional[utils.scheduler.Scheduler] = None
+
+    def open(self) -> None:
+        """Create the mixers, open the streams and create the scheduler.
+
+        Raises the error of sounddevice if a device can't be opened, a LookupError if
+        there is no device.
+        """
+        import utils.scheduler  # pylint: disable=import-outside-toplevel
+        self.open_streams()
+        self.scheduler = utils.scheduler.Scheduler(self.mixers, self.report)
+
+    def warm_up(self, progress: typing.Callable[[int, int], None], cancel: threading.Event,
+                entries: typing.Optional[list[utils.library.Metadata]] = None) \
+            -> dict[str, str]:
+        """Decode and analyse sound files for all outputs, blocks until done or cancelled.
+
+        Arguments:
+            - progress: called with the number of finished and all files.
+            - cancel: set to stop early.
+            - entries: metadata of the sound files, the whole library by default.
+
+        Returns:
+            The errors of the sounds that failed by file name.
+        """
+        import utils.warmup  # pylint: disable=import-outside-toplevel
+        if entries is None:
+            entries = utils.library.LIBRARY.entries()
+        return utils.warmup.warm_up(entries, [mixer.audio_format for mixer in self.mixers.values()],
+                                    progress, cancel)
+
+    def open_streams(self, default: bool = False) -> None:
+        """Create one mixer and open one long-lived stream per output, resolving the devices.
+
+        Every mixer matches the format of the device its output resolves to. Sounds are
+        mixed in the callbacks, outputs with passthrough share their stream with the input
+        passed through, like the virtual output with the microphone.
+
+        Arguments:
+            - default: use the default devices instead of the configured ones.
+        """
+        import utils.mixer  # pylint: disable=import-outside-toplevel
+        config = utils.config.CONFIG
+        devices = utils.devices.DEVICES
+        self.mixers = {}
+        try:
+            for name, output in config.output_table().items():
+                device = devices.resolve(None if default else output.device, "output")
+                mixer = self.mixers[name] = utils.mixer.Mixer.for_device(
+                    device, config.sample_format, name)
+                if output.passthrough:
+                    self.streams.append(mixer.open_duplex_stream(devices.resolve(
+                        None if default else output.input_device, "input"), device))
+                else:
+                    self.streams.append(mixer.open_stream(device))
+            for stream in self.streams:
+                stream.start()
+        except Exception:
+            self.close_streams()
+            raise
+        if self.scheduler is not None:
+            self.scheduler.mixers = self.mixers
+
+    def close_streams(self) -> None:
+        """Close all streams."""
+        for stream in self.streams:
+            stream.close()
+        self.streams.clear()
+
+    def refresh_devices(self) -> None:
+        """Enumerate the devices again to find added and removed ones, reopening the streams.
+
+        Playing sounds are stopped. If the configured devices can't be opened anymore, the
+        default devices are opened instead and the error is raised.
+        """
+        if self.scheduler is not None:
+            self.scheduler.stop_all()
+        self.close_streams()
+        utils.devices.DEVICES.refresh(reinitialize=True)
+        try:
+            self.open_streams()
+        except Exception:
+            self.open_streams(default=True)
+            raise
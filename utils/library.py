@@ -0,0 +1,262 @@
+"""Persistent metadata index of the sound library."""
+
+import bisect
+import os
+import pathlib
+import threading
+import time
+import typing
+
+import utils.config
+
+if typing.TYPE_CHECKING:
+    import sqlite3
+
+AUDIO_PATH = "audio/"
+FILE_TYPES = (".mp3", ".wav", ".ogg")
+INDEX_PATH = "cache/library.sqlite"
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sounds (
+    name TEXT PRIMARY KEY,
+    mtime INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    samplerate INTEGER NOT NULL,
+    channels INTEGER NOT NULL,
+    peak REAL,
+    rms REAL,
+    loudness REAL,
+    text TEXT NOT NULL,
+    emoji TEXT,
+    plays INTEGER NOT NULL DEFAULT 0,
+    last_played REAL NOT NULL DEFAULT 0
+)
+"""
+COLUMNS = ("name", "mtime", "size", "duration", "samplerate", "channels", "peak", "rms",
+           "loudness", "text", "emoji", "plays", "last_played")
+
+
+class Metadata(typing.NamedTuple):
+    """Metadata of a sound file."""
+    name: str
+    mtime: int
+    size: int
+    duration: float  # 0 if the file can't be read
+    samplerate: int
+    channels: int
+    peak: typing.Optional[float]  # None until the file was analysed
+    rms: typing.Optional[float]
+    loudness: typing.Optional[float]  # in LUFS, None if silent
+    text: str  # resolved from the sound config
+    emoji: typing.Optional[str]  # None for the default emoji
+    plays: int
+    last_played: float
+
+    @property
+    def path(self) -> pathlib.Path:
+        """Path of the sound file."""
+        return pathlib.Path(AUDIO_PATH, self.name)
+
+
+def gain(peak: typing.Optional[float], loudness: typing.Optional[float]) -> float:
+    """Get the gain bringing a sound to the target loudness.
+
+    Arguments:
+        - peak: peak level of the sound.
+        - loudness: integrated loudness of the sound.
+
+    Returns:
+        The linear gain, limited so the peak doesn't exceed full scale, 1 if the sound
+        wasn't analysed, is silent or normalization is off.
+    """
+    target = utils.config.CONFIG.loudness_target
+    if target is None or loudness is None:
+        return 1.0
+    result = 10 ** ((target - loudness) / 20)
+    return min(result, 1 / peak) if peak else result
+
+
+def label(name: str) -> tuple[str, typing.Optional[str]]:
+    """Resolve text and emoji of a sound from the sound config.
+
+    Arguments:
+        - name: file name of the sound.
+
+    Returns:
+        The text, the file name without suffix if not configured, and the emoji.
+    """
+    sound = utils.config.SOUNDS.get(name)
+    text = sound.text if sound is not None and sound.text else pathlib.Path(name).stem
+    return text, sound.emoji if sound is not None and sound.emoji else None
+
+
+class Library:
+    """Index of all sound files, updated incrementally by comparing mtime and size."""
+
+    def __init__(self, path: str = INDEX_PATH) -> None:
+        """Initialize the library.
+
+        Arguments:
+            - path: path of the index database.
+        """
+        self.path = path
+        self._connection: "typing.Optional[sqlite3.Connection]" = None
+        self._plays: dict[str, tuple[int, float]] = {}
+        self._gains: dict[str, float] = {}  # of analysed sounds
+        self._entries: typing.Optional[list[Metadata]] = None  # of the last scan
+        self._lock = threading.Lock()
+        self._scan_lock = threading.Lock()  # one scan at a time, held while sweeping
+
+    @property
+    def connection(self) -> "sqlite3.Connection":
+        """Connection to the index, created on first use, sqlite3 is imported with it."""
+        if self._connection is None:
+            import sqlite3  # pylint: disable=import-outside-toplevel,redefined-outer-name
+            pathlib.Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                connection.execute("DROP TABLE IF EXISTS sounds")
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            connection.execute(SCHEMA)
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def entries(self) -> list[Metadata]:
+        """Get the metadata of the last scan, scanning if there was none yet.
+
+        The soundboard and the warm-up share one scan instead of sweeping AUDIO_PATH each.
+
+        Returns:
+            Metadata of all sound files, sorted by name.
+        """
+        with self._scan_lock:
+            if self._entries is None:
+                self._entries = self._scan()
+            return self._entries
+
+    def scan(self) -> list[Metadata]:
+        """Read the index and update it with a stat sweep over AUDIO_PATH.
+
+        Only new and changed files are opened, to read their header.
+
+        Returns:
+            Metadata of all sound files, sorted by name.
+        """
+        with self._scan_lock:
+            self._entries = self._scan()
+            return self._entries
+
+    def _scan(self) -> list[Metadata]:
+        """Scan while holding the scan lock."""
+        with self._lock:
+            known = {row[0]: Metadata(*row) for row in self.connection.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM sounds")}
+        entries: list[Metadata] = []
+        changed: list[Metadata] = []  # new and modified files, to be analysed again
+        relabeled: list[Metadata] = []
+        with os.scandir(AUDIO_PATH) as scan:
+            for item in scan:
+                if not item.is_file() or not item.name.endswith(FILE_TYPES):
+                    continue
+                stat = item.stat()
+                entry = known.pop(item.name, None)
+                text, emoji = label(item.name)
+                if entry is None or (entry.mtime, entry.size) != (stat.st_mtime_ns, stat.st_size):
+                    entry = self._read(item.path, stat, entry)._replace(text=text, emoji=emoji)
+                    changed.append(entry)
+                elif (entry.text, entry.emoji) != (text, emoji):
+                    entry = entry._replace(text=text, emoji=emoji)
+                    relabeled.append(entry)
+                entries.append(entry)
+        unchanged = {entry.name for entry in entries} - {entry.name for entry in changed}
+        with self._lock, self.connection:
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO sounds ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(COLUMNS))})", changed)
+            # levels stored by update_levels since the index was read are kept
+            self.connection.executemany("UPDATE sounds SET text = ?, emoji = ? WHERE name = ?",
+                                        [(entry.text, entry.emoji, entry.name)
+                                         for entry in relabeled])
+            self.connection.executemany("DELETE FROM sounds WHERE name = ?",
+                                        [(name,) for name in known])
+            gains = {entry.name: gain(entry.peak, entry.loudness) for entry in entries
+                     if entry.loudness is not None}
+            gains.update((name, value) for name, value in self._gains.items()
+                         if name in unchanged)
+            self._gains = gains
+        return sorted(entries)
+
+    @staticmethod
+    def _read(path: str, stat: os.stat_result, previous: typing.Optional[Metadata]) -> Metadata:
+        """Read the header of a new or changed file, keeping the play statistics."""
+        import soundfile  # pylint: disable=import-outside-toplevel
+        plays, last_played = (previous.plays, previous.last_played) if previous else (0, 0.0)
+        try:
+            info = soundfile.info(path)
+            duration, samplerate, channels = info.duration, info.samplerate, info.channels
+        except (OSError, soundfile.LibsndfileError):
+            duration, samplerate, channels = 0.0, 0, 0
+        return Metadata(os.path.basename(path), stat.st_mtime_ns, stat.st_size, duration,
+                        samplerate, channels, None, None, None, "", None, plays, last_played)
+
+    def update_levels(self,
+                      levels: dict[str, tuple[float, float, typing.Optional[float]]]) -> None:
+        """Store the analysed levels of sounds.
+
+        Arguments:
+            - levels: peak, rms and loudness by file name.
+        """
+        with self._lock, self.connection:
+            self.connection.executemany(
+                "UPDATE sounds SET peak = ?, rms = ?, loudness = ? WHERE name = ?",
+                [(*level, name) for name, level in levels.items()])
+            for name, (peak, _, loudness) in levels.items():
+                self._gains[name] = gain(peak, loudness)
+
+    def gain(self, name: str) -> float:
+        """Get the gain normalizing the loudness of a sound.
+
+        Arguments:
+            - name: file name of the sound.
+
+        Returns:
+            The linear gain, 1 until the sound was analysed.
+        """
+        return self._gains.get(name, 1.0)
+
+    def duration(self, name: str) -> typing.Optional[float]:
+        """Get the duration of a sound from the last scan, without opening the file.
+
+        Arguments:
+            - name: file name of the sound.
+
+        Returns:
+            The duration in seconds, 0 if the header couldn't be read, None if the sound
+            wasn't scanned yet.
+        """
+        entries = self._entries or []
+        index = bisect.bisect_left(entries, name, key=lambda entry: entry.name)
+        return entries[index].duration \
+            if index < len(entries) and entries[index].name == name else None
+
+    def record(self, name: str) -> None:
+        """Record a trigger of a sound, kept in memory until stored.
+
+        Arguments:
+            - name: file name of the sound.
+        """
+        plays, _ = self._plays.get(name, (0, 0.0))
+        self._plays[name] = (plays + 1, time.time())
+
+    def store(self) -> None:
+        """Store the recorded triggers in the index."""
+        plays, self._plays = self._plays, {}
+        with self._lock, self.connection:
+            self.connection.executemany(
+                "UPDATE sounds SET plays = plays + ?, last_played = ? WHERE name = ?",
+                [(count, last, name) for name, (count, last) in plays.items()])
+
+
+LIBRARY = Library()
@@ -0,0 +1,185 @@
+"""Integrated loudness after ITU-R BS.1770, vectorized with numpy."""
+
+import math
+import typing
+
+import numpy
+
+STEP = 0.1  # seconds between gating blocks
+BLOCK_STEPS = 4  # steps per gating block of 400 ms, overlapping by 75 %
+ABSOLUTE_GATE = -70.0  # in LUFS
+RELATIVE_GATE = -10.0  # in LU below the loudness of the blocks above the absolute gate
+OFFSET = -0.691
+# K-weighting, a high shelf modelling the head followed by a high-pass
+SHELF = (1681.974450955533, 3.999843853973347, 0.7071752369554196)  # frequency, gain in dB, Q
+HIGH_PASS = (38.13547087602444, 0.5003270373238773)  # frequency, Q
+# in the 5.1 order left, right, center, low-frequency effects (left out) and surround,
+# other channels 1
+CHANNEL_WEIGHTS = (1.0, 1.0, 1.0, 0.0, 1.41, 1.41)
+
+
+def response(b: tuple[float, float, float], a: tuple[float, float, float],
+             angles: numpy.ndarray) -> numpy.ndarray:
+    """Get the power response of a biquad filter.
+
+    Arguments:
+        - b: coefficients of the numerator.
+        - a: coefficients of the denominator.
+        - angles: normalized angular frequencies.
+
+    Returns:
+        The squared magnitude at every frequency.
+    """
+    z = numpy.exp(-1j * angles)
+    return numpy.abs(numpy.polyval(b[::-1], z) / numpy.polyval(a[::-1], z)) ** 2
+
+
+def k_weighting(samplerate: int, size: int) -> numpy.ndarray:
+    """Get the power response of the K-weighting filter at the bins of a real fft.
+
+    Arguments:
+        - samplerate: samplerate of the audio data.
+        - size: number of samples transformed.
+
+    Returns:
+        The squared magnitude at every bin.
+    """
+    angles = 2 * numpy.pi * numpy.fft.rfftfreq(size)
+    frequency, gain, quality = SHELF
+    k = math.tan(math.pi * frequency / samplerate)
+    high = 10 ** (gain / 20)
+    band = high ** 0.4996667741545416
+    shelf = response((high + band * k / quality + k * k, 2 * (k * k - high),
+                      high - band * k / quality + k * k),
+                     (1 + k / quality + k * k, 2 * (k * k - 1), 1 - k / quality + k * k), angles)
+    frequency, quality = HIGH_PASS
+    k = math.tan(math.pi * frequency / samplerate)
+    scale = 1 + k / quality + k * k  # the numerator isn't scaled with the denominator
+    high_pass = response((1.0, -2.0, 1.0),
+                         (1.0, 2 * (k * k - 1) / scale, (1 - k / quality + k * k) / scale), angles)
+    return shelf * high_pass
+
+
+def energies(data: numpy.ndarray, samplerate: int, size: int) -> numpy.ndarray:
+    """Measure the K-weighted energy of steps of audio data.
+
+    The steps are filtered in the frequency domain all at once, so the energy of a step is
+    the weighted sum of its spectrum. That filters every step on its own, as if it repeated,
+    without the filter state of the previous step. The loudness differs from filtering in
+    the time domain by up to about 0.05 dB, most for short clips with sharp attacks.
+
+    Arguments:
+        - data: float audio data with shape (steps * size, channels).
+        - samplerate: samplerate of the audio data.
+        - size: frames per step.
+
+    Returns:
+        The energy with shape (steps, channels).
+    """
+    frames = data.reshape(len(data) // size, size, data.shape[1])
+    power = numpy.square(numpy.abs(numpy.fft.rfft(frames, axis=1)))
+    # both halves of the spectrum count, except the dc and nyquist bins
+    bins = numpy.full(power.shape[1], 2.0)
+    bins[0] = 1.0
+    if size % 2 == 0:
+        bins[-1] = 1.0
+    return numpy.einsum("sbc,b->sc", power, bins * k_weighting(samplerate, size)) / size
+
+
+def gate(energy: numpy.ndarray, size: int) -> typing.Optional[float]:
+    """Get the gated loudness of the overlapping gating blocks of steps.
+
+    Arguments:
+        - energy: energy of the steps with shape (steps, channels).
+        - size: frames per step.
+
+    Returns:
+        The loudness in LUFS, None if the audio is silent.
+    """
+    window = min(BLOCK_STEPS, len(energy))
+    blocks = numpy.lib.stride_tricks.sliding_window_view(energy, window, axis=0).sum(axis=-1)
+    weights = numpy.ones(energy.shape[1])
+    count = min(len(weights), len(CHANNEL_WEIGHTS))
+    weights[:count] = CHANNEL_WEIGHTS[:count]
+    weighted = blocks @ weights / (window * size)
+    with numpy.errstate(divide="ignore"):
+        loudness = OFFSET + 10 * numpy.log10(weighted)
+    gated = weighted[loudness > ABSOLUTE_GATE]
+    if gated.size == 0:
+        return None
+    relative = OFFSET + 10 * math.log10(gated.mean()) + RELATIVE_GATE
+    gated = weighted[(loudness > ABSOLUTE_GATE) & (loudness > relative)]
+    return OFFSET + 10 * math.log10(gated.mean())
+
+
+def integrated(data: numpy.ndarray, samplerate: int) -> typing.Optional[float]:
+    """Measure the gated integrated loudness of audio data.
+
+    The signal is cut into steps, the gating blocks overlap by all but one step. Clips
+    shorter than a gating block are measured as one block.
+
+    Arguments:
+        - data: float audio data with shape (frames, channels).
+        - samplerate: samplerate of the audio data.
+
+    Returns:
+        The loudness in LUFS, None if the audio is silent.
+    """
+    size = round(samplerate * STEP)
+    steps = len(data) // size
+    if steps < BLOCK_STEPS:
+        size, steps = len(data), 1
+    if size == 0:
+        return None
+    return gate(energies(data[:steps * size], samplerate, size), size)
+
+
+class Meter:
+    """Integrated loudness measured block by block, for audio that isn't decoded at once.
+
+    Only the energy of every step is kept, the result is the same as measuring all audio
+    data at once.
+    """
+
+    def __init__(self, samplerate: int) -> None:
+        """Initialize the meter.
+
+        Arguments:
+            - samplerate: samplerate of the audio data.
+        """
+        self.samplerate = samplerate
+        self.size = round(samplerate * STEP)
+        self._pending: list[numpy.ndarray] = []  # frames of less than a step, or a block
+        self._frames = 0
+        self._energy: list[numpy.ndarray] = []
+        self._steps = 0
+
+    def add(self, data: numpy.ndarray) -> None:
+        """Measure the next audio data.
+
+        Arguments:
+            - data: float audio data with shape (frames, channels).
+        """
+        self._pending.append(data)
+        self._frames += len(data)
+        # until there are enough steps for a gating block, a short clip is one block
+        if self._steps + self._frames // self.size < BLOCK_STEPS:
+            return
+        pending = numpy.concatenate(self._pending)
+        steps = len(pending) // self.size
+        self._energy.append(energies(pending[:steps * self.size], self.samplerate, self.size))
+        self._steps += steps
+        self._pending = [pending[steps * self.size:]]
+        self._frames = len(self._pending[0])
+
+    def result(self) -> typing.Optional[float]:
+        """Get the loudness of all measured audio data.
+
+        Returns:
+            The loudness in LUFS, None if the audio is silent.
+        """
+        if self._steps:
+            return gate(numpy.concatenate(self._energy), self.size)
+        if not self._pending:
+            return None
+        return integrated(numpy.concatenate(self._pending), self.samplerate)
@@ -0,0 +1,285 @@
+"""Polyphonic mixer."""
+
+import collections
+import time
+import typing
+
+import numpy
+import sounddevice
+
+import utils.devices
+import utils.stats
+
+BLOCKSIZE = 512
+MAX_VOICES = 32
+THRESHOLD = 0.8  # the limiter starts to compress above this level
+INT16_SCALE = 32768.0
+
+Stream = sounddevice.OutputStream | sounddevice.Stream
+
+
+class Voice:
+    """A sound being played by a mixer."""
+    __slots__ = ("data", "gain", "position", "stopped", "after", "trace")
+
+    def __init__(self, data: numpy.ndarray, gain: float) -> None:
+        """Initialize the voice.
+
+        Arguments:
+            - data: audio data with shape (frames, channels) in the format of the mixer.
+            - gain: linear gain applied to the audio data.
+        """
+        self.data = data
+        self.gain = gain
+        self.position = 0
+        self.stopped = False
+        self.after: typing.Optional[Voice] = None  # waits for this voice to end
+        self.trace: typing.Optional[utils.stats.Trace] = None  # until the first block
+
+    @property
+    def done(self) -> bool:
+        """Whether the voice has nothing left to play."""
+        return self.stopped or self.position >= len(self.data)
+
+    def read(self, frames: int) -> numpy.ndarray:
+        """Get the next frames to play, called from the callback.
+
+        Arguments:
+            - frames: number of frames requested.
+
+        Returns:
+            Up to frames frames of audio data.
+        """
+        chunk = self.data[self.position:self.position + frames]
+        self.position += frames
+        return chunk
+
+    def stop(self) -> None:
+        """Stop the voice, it is removed from the mixer with the next block."""
+        self.stopped = True
+
+
+class Mixer:
+    """Mixer summing any number of voices in the callback of a long-lived stream."""
+
+    def __init__(self, samplerate: int, channels: int, dtype: str = "float32",
+                 name: str = "mixer") -> None:
+        """Initialize the mixer.
+
+        Arguments:
+            - samplerate: samplerate of the output.
+            - channels: number of output channels.
+            - dtype: sample format of the stream, "float32" or "int16".
+            - name: name of the mixer in the stats.
+        """
+        self.samplerate = samplerate
+        self.channels = channels
+        self.dtype = dtype
+        self.name = name
+        self._histograms, self._status = utils.stats.STATS.mixer(name)
+        # the deque hands voices to the callback without locking, the callback only
+        # touches the preallocated voice table and buffers afterwards
+        self._pending: collections.deque[Voice] = collections.deque()
+        self._voices: list[typing.Optional[Voice]] = [None] * MAX_VOICES
+        self._buffer = numpy.zeros((BLOCKSIZE, channels), dtype=numpy.float32)
+        self._scratch = numpy.zeros((BLOCKSIZE, channels), dtype=numpy.float32)
+        self._over = numpy.zeros((BLOCKSIZE, channels), dtype=bool)
+
+    @classmethod
+    def for_device(cls, device: int, dtype: str = "float32", name: str = "mixer") -> "Mixer":
+        """Create a mixer matching the default format of an output device.
+
+        Arguments:
+            - device: index of the output device.
+            - dtype: sample format of the stream, "float32" or "int16".
+            - name: name of the mixer in the stats.
+
+        Returns:
+            The mixer.
+        """
+        info = utils.devices.DEVICES.device(device)
+        return cls(int(info.default_samplerate), min(info.max_output_channels, 2), dtype, name)
+
+    def open_stream(self, device: int) -> sounddevice.OutputStream:
+        """Open an output stream playing this mixer.
+
+        Arguments:
+            - device: index of the output device.
+
+        Returns:
+            The stream, to be used as a context manager.
+        """
+        return sounddevice.OutputStream(device=device, samplerate=self.samplerate,
+                                        channels=self.channels, dtype=self.dtype,
+                                        blocksize=BLOCKSIZE, latency="low",
+                                        callback=self.callback)
+
+    def open_duplex_stream(self, input_device: int, output_device: int) -> sounddevice.Stream:
+        """Open a duplex stream passing the input through and mixing this mixer into it.
+
+        Arguments:
+            - input_device: index of the input device.
+            - output_device: index of the output device.
+
+        Returns:
+            The stream, to be used as a context manager.
+        """
+        input_channels = min(utils.devices.DEVICES.device(input_device).max_input_channels,
+                             self.channels)
+        return sounddevice.Stream(device=(input_device, output_device),
+                                  samplerate=self.samplerate,
+                                  channels=(input_channels, self.channels),
+                                  dtype=self.dtype, blocksize=BLOCKSIZE, latency="low",
+                                  callback=self.duplex_callback)
+
+    @property
+    def audio_format(self) -> tuple[int, int]:
+        """Samplerate and channels audio data has to be converted to."""
+        return self.samplerate, self.channels
+
+    def play(self, data: numpy.ndarray, gain: float = 1.0) -> Voice:
+        """Start playing audio data in the next block.
+
+        Arguments:
+            - data: audio data in the format of the mixer, mono or with shape (frames, channels),
+              mono data is played on all channels.
+            - gain: linear gain applied to the audio data.
+
+        Returns:
+            The new voice.
+        """
+        return self.add(Voice(data.reshape(-1, 1) if data.ndim == 1 else data, gain))
+
+    def add(self, voice: Voice) -> Voice:
+        """Start playing a voice in the next block.
+
+        Arguments:
+            - voice: the voice.
+
+        Returns:
+            The voice.
+        """
+        self._pending.append(voice)  # deque operations are thread-safe
+        return voice
+
+    def mix(self, outdata: numpy.ndarray, delay: float = 0.0) -> None:
+        """Add all active voices to a block and limit the result.
+
+        Mixing happens in float32, int16 voices and blocks are scaled on the way in and out.
+
+        Arguments:
+            - outdata: the block with shape (frames, channels) and the dtype of the mixer,
+              mixed in place.
+            - delay: seconds until the block reaches the device, for the stats.
+        """
+        while self._pending:
+            self._start(self._pending.popleft())
+        frames = len(outdata)
+        if frames > len(self._buffer):
+            self._buffer = numpy.zeros((frames, self.channels), dtype=numpy.float32)
+            self._scratch = numpy.zeros((frames, self.channels), dtype=numpy.float32)
+            self._over = numpy.zeros((frames, self.channels), dtype=bool)
+        buffer = self._buffer[:frames]
+        active = False
+        for slot, voice in enumerate(self._voices):
+            if voice is None:
+                continue
+            if voice.stopped:
+                self._voices[slot] = None
+                continue
+            if voice.after is not None:
+                if not voice.after.done:
+                    continue
+                voice.after = None
+            if not active:
+                if outdata.dtype == numpy.int16:
+                    numpy.multiply(outdata, numpy.float32(1 / INT16_SCALE), out=buffer)
+                else:
+                    buffer[:] = outdata
+                active = True
+            chunk = voice.read(frames)
+            if voice.trace is not None and len(chunk):  # starts playing with this block
+                started = time.perf_counter()
+                voice.trace.started = started
+                utils.stats.record(self._histograms, voice.trace, started + delay)
+                voice.trace = None
+            gain = voice.gain / INT16_SCALE if chunk.dtype == numpy.int16 else voice.gain
+            scratch = self._scratch[:len(chunk), :chunk.shape[1]]
+            numpy.multiply(chunk, numpy.float32(gain), out=scratch)
+            buffer[:len(chunk)] += scratch
+            if voice.done:
+                self._voices[slot] = None
+        if active:
+            limit(buffer, self._scratch[:frames], self._over[:frames])
+            if outdata.dtype == numpy.int16:
+                numpy.multiply(buffer, numpy.float32(INT16_SCALE - 1), out=buffer)
+                numpy.rint(buffer, out=buffer)
+            outdata[:] = buffer
+
+    def stop_all(self) -> None:
+        """Stop all pending and active voices."""
+        while self._pending:
+            self._pending.popleft().stop()
+        for voice in list(self._voices):
+            if voice is not None:
+                voice.stop()
+
+    def _start(self, voice: Voice) -> None:
+        """Put a voice into a free slot, replacing the oldest voice if all are in use."""
+        for slot, current in enumerate(self._voices):
+            if current is None:
+                self._voices[slot] = voice
+                return
+        oldest = max(range(MAX_VOICES),
+                     key=lambda slot: typing.cast(Voice, self._voices[slot]).position)
+        typing.cast(Voice, self._voices[oldest]).stop()
+        self._voices[oldest] = voice
+
+    def callback(self, outdata: numpy.ndarray, _frames: int, time_info: typing.Any,
+                 status: sounddevice.CallbackFlags) -> None:
+        """Callback function of the output stream."""
+        outdata.fill(0)
+        self.mix(outdata, self._count(time_info, status))
+
+    def duplex_callback(self, indata: numpy.ndarray, outdata: numpy.ndarray, _frames: int,
+                        time_info: typing.Any, status: sounddevice.CallbackFlags) -> None:
+        """Callback function of the duplex stream, sample-aligned with the input."""
+        outdata[:] = indata
+        self.mix(outdata, self._count(time_info, status))
+
+    def _count(self, time_info: typing.Any, status: sounddevice.CallbackFlags) -> float:
+        """Count a callback and its status flags for the stats.
+
+        Returns:
+            Seconds until the block reaches the device.
+        """
+        self._status["callbacks"] += 1
+        if status:
+            for flag in utils.stats.STATUS_FLAGS:
+                if getattr(status, flag):
+                    self._status[flag] += 1
+        return max(0.0, time_info.outputBufferDacTime - time_info.currentTime)
+
+
+def limit(buffer: numpy.ndarray, magnitude: numpy.ndarray, over: numpy.ndarray) -> None:
+    """Soft-clip samples above THRESHOLD so the sum of voices never exceeds full scale.
+
+    Works in the given scratch arrays, so it doesn't allocate in the callback.
+
+    Arguments:
+        - buffer: the samples, limited in place.
+        - magnitude: float32 scratch array with the shape of the buffer.
+        - over: bool scratch array with the shape of the buffer.
+    """
+    numpy.abs(buffer, out=magnitude)
+    # reducing the flat view, a reduction over both axes allocates an iteration buffer
+    if magnitude.reshape(-1).max(initial=0.0) <= THRESHOLD:
+        return
+    numpy.greater(magnitude, THRESHOLD, out=over)
+    headroom = numpy.float32(1.0 - THRESHOLD)
+    magnitude -= numpy.float32(THRESHOLD)
+    magnitude /= headroom
+    numpy.tanh(magnitude, out=magnitude)
+    magnitude *= headroom
+    magnitude += numpy.float32(THRESHOLD)
+    numpy.copysign(magnitude, buffer, out=buffer, where=over)
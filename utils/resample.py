@@ -0,0 +1,195 @@
+"""Samplerate and channel conversion."""
+
+import functools
+import math
+
+import numpy
+
+ZERO_CROSSINGS = 16  # half length of the filter in zero crossings of the sinc
+ROLLOFF = 0.945  # cutoff relative to the lower nyquist frequency
+BETA = 8.6  # kaiser window shape, about 80 dB stopband attenuation
+
+
+def as_float(data: numpy.ndarray) -> numpy.ndarray:
+    """Get audio data as float32 in the range of -1 to 1.
+
+    Arguments:
+        - data: float or int16 audio data.
+
+    Returns:
+        The audio data, not copied if already float32.
+    """
+    if data.dtype == numpy.int16:
+        return numpy.multiply(data, numpy.float32(1 / 32768), dtype=numpy.float32)
+    return numpy.asarray(data, dtype=numpy.float32)
+
+
+def as_dtype(data: numpy.ndarray, dtype: str) -> numpy.ndarray:
+    """Get audio data with a sample format.
+
+    Arguments:
+        - data: float or int16 audio data.
+        - dtype: "float32" or "int16".
+
+    Returns:
+        The audio data, not copied if already in the sample format.
+    """
+    if dtype != "int16":
+        return as_float(data)
+    if data.dtype == numpy.int16:
+        return data
+    scaled = numpy.rint(numpy.multiply(data, numpy.float32(32767), dtype=numpy.float32))
+    return numpy.clip(scaled, -32768, 32767).astype(numpy.int16)
+
+
+@functools.lru_cache(maxsize=16)
+def design(up: int, down: int) -> numpy.ndarray:
+    """Design a windowed sinc lowpass filter split into polyphase components.
+
+    Arguments:
+        - up: upsampling factor.
+        - down: downsampling factor.
+
+    Returns:
+        The filter bank with shape (up, taps), row p holding the coefficients of phase p.
+    """
+    factor = max(up, down)
+    length = 2 * ZERO_CROSSINGS * factor + 1
+    cutoff = ROLLOFF / factor
+    n = numpy.arange(length) - (length - 1) / 2
+    coefficients = up * cutoff * numpy.sinc(cutoff * n) * numpy.kaiser(length, BETA)
+    taps = math.ceil(length / up)
+    coefficients = numpy.pad(coefficients, (0, taps * up - length))
+    return coefficients.reshape(taps, up).T.astype(numpy.float32)
+
+
+def resample(data: numpy.ndarray, samplerate: int, target: int) -> numpy.ndarray:
+    """Resample audio data with a polyphase filter, only computing the needed outputs.
+
+    Outputs repeat their filter phase every `up` frames, so each phase is one strided
+    matrix product over sliding windows of the input.
+
+    Arguments:
+        - data: audio data with shape (frames, channels).
+        - samplerate: samplerate of the audio data.
+        - target: samplerate to convert to.
+
+    Returns:
+        The resampled audio data as float32.
+    """
+    if samplerate == target or len(data) == 0:
+        return as_float(data)
+    divisor = math.gcd(samplerate, target)
+    up, down = target // divisor, samplerate // divisor
+    bank = design(up, down)[:, ::-1]
+    taps = bank.shape[1]
+    offset = ZERO_CROSSINGS * max(up, down)  # delay of the filter in upsampled frames
+    padded = numpy.pad(as_float(data), ((taps, taps), (0, 0)))
+    windows = numpy.lib.stride_tricks.sliding_window_view(padded, taps, axis=0)
+    frames = math.ceil(len(data) * up / down)
+    result = numpy.empty((frames, data.shape[1]), dtype=numpy.float32)
+    for first in range(min(up, frames)):
+        position = first * down + offset
+        start = position // up + 1  # window ending at the input frame of this output
+        count = len(range(first, frames, up))
+        result[first::up] = windows[start:start + count * down:down] @ bank[position % up]
+    return result
+
+
+class StreamResampler:
+    """Resampler converting audio block by block, keeping the filter state in between."""
+
+    def __init__(self, samplerate: int, target: int, channels: int) -> None:
+        """Initialize the resampler.
+
+        Arguments:
+            - samplerate: samplerate of the audio data.
+            - target: samplerate to convert to.
+            - channels: number of channels of the audio data.
+        """
+        divisor = math.gcd(samplerate, target)
+        self.up, self.down = target // divisor, samplerate // divisor
+        self.bank = design(self.up, self.down)[:, ::-1]
+        self.taps = self.bank.shape[1]
+        self.offset = ZERO_CROSSINGS * max(self.up, self.down)
+        # input frames before the first one are silence
+        self._history = numpy.zeros((self.taps, channels), dtype=numpy.float32)
+        self._start = -self.taps  # input frame index of the first history frame
+        self._inputs = 0
+        self._outputs = 0
+
+    def process(self, block: numpy.ndarray, final: bool = False) -> numpy.ndarray:
+        """Resample the next block.
+
+        Arguments:
+            - block: audio data with shape (frames, channels).
+            - final: whether this is the last block, flushes the filter.
+
+        Returns:
+            All output frames that can be computed so far as float32.
+        """
+        if self.up == self.down:
+            return as_float(block)
+        self._inputs += len(block)
+        history = [self._history, as_float(block)]
+        if final:
+            history.append(numpy.zeros((self.taps, block.shape[1]), dtype=numpy.float32))
+        self._history = numpy.concatenate(history)
+        end = self._start + len(self._history)
+        if final:
+            last = math.ceil(self._inputs * self.up / self.down)
+        else:  # every output whose newest input frame has arrived
+            last = max(self._outputs, -(-(end * self.up - self.offset) // self.down))
+        position = numpy.arange(self._outputs, last) * self.down + self.offset
+        first = position // self.up - self.taps + 1 - self._start
+        indices = first[:, numpy.newaxis] + numpy.arange(self.taps)
+        result = numpy.einsum("nk,nkc->nc", self.bank[position % self.up],
+                              self._history[indices]).astype(numpy.float32, copy=False)
+        self._outputs = last
+        keep = (last * self.down + self.offset) // self.up - self.taps + 1 - self._start
+        if keep > 0:
+            self._history = self._history[keep:]
+            self._start += keep
+        return result
+
+
+def remix(data: numpy.ndarray, channels: int) -> numpy.ndarray:
+    """Map audio data to a number of channels.
+
+    Mono audio stays mono, it is spread over all channels when mixing. Downmixed audio is
+    float32, the other conversions keep the sample format.
+
+    Arguments:
+        - data: audio data with shape (frames, channels) or (frames,).
+        - channels: number of channels to convert to.
+
+    Returns:
+        The remixed audio data.
+    """
+    if data.ndim == 1:
+        data = data[:, numpy.newaxis]
+    if channels == 1 and data.shape[1] > 1:
+        return as_float(data).mean(axis=1, keepdims=True)
+    if data.shape[1] > channels:
+        return data[:, :channels]
+    if 1 < data.shape[1] < channels:
+        return numpy.pad(data, ((0, 0), (0, channels - data.shape[1])))
+    return data
+
+
+def convert(data: numpy.ndarray, samplerate: int, target: int, channels: int,
+            dtype: str = "float32") -> numpy.ndarray:
+    """Convert audio data to the format of a device.
+
+    Arguments:
+        - data: audio data with shape (frames, channels).
+        - samplerate: samplerate of the audio data.
+        - target: samplerate of the device.
+        - channels: number of channels of the device.
+        - dtype: sample format of the result, "float32" or "int16".
+
+    Returns:
+        The converted audio data.
+    """
+    return numpy.ascontiguousarray(as_dtype(resample(remix(data, channels), samplerate, target),
+                                            dtype))
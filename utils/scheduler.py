@@ -0,0 +1,300 @@
+"""Playback scheduler applying the trigger policies of sounds."""
+
+import concurrent.futures
+import functools
+import pathlib
+import threading
+import time
+import typing
+
+import numpy
+
+import utils.cache
+import utils.config
+import utils.library
+import utils.mixer
+import utils.stats
+import utils.stream
+
+# called with the file name of a sound and the error when playing it fails after it started
+Report = typing.Callable[[str, Exception], None]
+
+
+class Playback:
+    """One trigger of a sound, played by one voice per route."""
+
+    def __init__(self, name: str, mixers: list[utils.mixer.Mixer],
+                 voices: list[utils.mixer.Voice]) -> None:
+        """Initialize the playback.
+
+        Arguments:
+            - name: file name of the sound.
+            - mixers: the mixer of every route.
+            - voices: the voices, one per route.
+        """
+        self.name = name
+        self.mixers = mixers
+        self.voices = voices
+
+    @property
+    def done(self) -> bool:
+        """Whether all voices have ended or were stopped."""
+        return all(voice.done for voice in self.voices)
+
+    def stop(self) -> None:
+        """Stop all voices."""
+        for voice in self.voices:
+            voice.stop()
+
+
+def trace(voices: list[utils.mixer.Voice], pressed: float) -> list[utils.mixer.Voice]:
+    """Start tracing the latency of decoded voices.
+
+    Arguments:
+        - voices: the voices.
+        - pressed: when the trigger was pressed, from time.perf_counter.
+
+    Returns:
+        The voices.
+    """
+    decoded = time.perf_counter()
+    for voice in voices:
+        voice.trace = utils.stats.Trace(pressed, decoded)
+    return voices
+
+
+class Scheduler:
+    """Scheduler between sound buttons and mixers.
+
+    Policies of sounds (see utils.config.Sound):
+        - overlap: every trigger plays, even while the sound is playing.
+        - retrigger: a trigger restarts the sound.
+        - ignore: triggers are ignored while the sound is playing.
+        - queue: triggers are queued after the playing sound, up to max_queue.
+    Triggering a sound with a choke group stops all sounds of that group first.
+    Sounds are played on the outputs of their routes, or of the default routes, decoded
+    once and shared by all routes to outputs with the same format.
+    """
+
+    def __init__(self, mixers: dict[str, utils.mixer.Mixer],
+                 report: typing.Optional[Report] = None) -> None:
+        """Initialize the scheduler.
+
+        Arguments:
+            - mixers: the mixers to play on by output name.
+            - report: called with errors of streamed sounds, from their reader thread.
+        """
+        self.mixers = mixers
+        self.report = report
+        self._playing: dict[str, list[Playback]] = {}
+        self._loading: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def trigger(self, file: pathlib.Path, pressed: typing.Optional[float] = None) \
+            -> concurrent.futures.Future[typing.Optional[Playback]]:
+        """Trigger a sound according to its policy.
+
+        Decoding happens in the decode pool, the policy is applied once the audio is ready.
+
+        Arguments:
+            - file: path of the sound file.
+            - pressed: when the trigger was pressed, from time.perf_counter, for the stats.
+
+        Returns:
+            A future of the playback, None if the trigger was ignored. A ValueError is raised
+            if the sound has no routes to open outputs.
+        """
+        name = file.name
+        sound = utils.config.SOUNDS.get(name) or utils.config.Sound()
+        utils.library.LIBRARY.record(name)
+        result: concurrent.futures.Future[typing.Optional[Playback]] = concurrent.futures.Future()
+        routes = self.routes(sound)
+        with self._lock:
+            if sound.policy == "ignore" and self.playing(name):
+                result.set_result(None)
+                return result
+            self._loading[name] = self._loading.get(name, 0) + 1
+        try:
+            decoded = self._voices(file, routes,
+                                   time.perf_counter() if pressed is None else pressed)
+        except Exception:
+            self._loaded(name)
+            raise
+
+        def start(decoded: concurrent.futures.Future[list[utils.mixer.Voice]]) -> None:
+            try:
+                result.set_result(self._start(name, sound, [mixer for mixer, _ in routes],
+                                              decoded.result()))
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                result.set_exception(exc)
+            finally:
+                self._loaded(name)
+
+        decoded.add_done_callback(start)
+        return result
+
+    def routes(self, sound: utils.config.Sound) -> list[tuple[utils.mixer.Mixer, float]]:
+        """Get the routes of a sound.
+
+        Arguments:
+            - sound: configuration of the sound.
+
+        Returns:
+            The mixer and gain of every route, a ValueError is raised if there are none or
+            some outputs aren't open.
+        """
+        routes = sound.routes if sound.routes is not None else utils.config.CONFIG.routes
+        unknown = {route.output for route in routes} - self.mixers.keys()
+        if unknown:
+            raise ValueError(f"routes to outputs that aren't open: {', '.join(sorted(unknown))}")
+        if not routes:
+            raise ValueError("there are no routes")
+        return [(self.mixers[route.output], route.gain) for route in routes]
+
+    def _start(self, name: str, sound: utils.config.Sound, mixers: list[utils.mixer.Mixer],
+               voices: list[utils.mixer.Voice]) -> typing.Optional[Playback]:
+        """Apply the policy of a sound and start its decoded voices.
+
+        Arguments:
+            - name: file name of the sound.
+            - sound: configuration of the sound.
+            - mixers: the mixer of every route.
+            - voices: the voices, one per route.
+
+        Returns:
+            The playback, None if the trigger was ignored.
+        """
+        with self._lock:
+            playing = self.playing(name)
+            if sound.policy == "ignore" and playing \
+                    or sound.policy == "queue" and len(playing) > sound.max_queue:
+                for voice in voices:
+                    voice.stop()  # ends the reader of streaming voices
+                return None
+            if sound.choke_group is not None:
+                self._choke(sound.choke_group)
+            elif sound.policy == "retrigger":
+                self._stop(name)
+            playback = Playback(name, mixers, voices)
+            if sound.policy == "queue" and self.playing(name):
+                last = self._playing[name][-1]
+                previous = dict(zip(last.mixers, last.voices))
+                for mixer, voice in zip(mixers, voices):
+                    voice.after = previous.get(mixer)
+            for mixer, voice in zip(mixers, voices):
+                if voice.trace is not None:
+                    voice.trace.enqueued = time.perf_counter()
+                mixer.add(voice)
+            self._playing.setdefault(name, []).append(playback)
+            return playback
+
+    def playing(self, name: str) -> list[Playback]:
+        """Get the playing and queued playbacks of a sound.
+
+        Arguments:
+            - name: file name of the sound.
+
+        Returns:
+            The playbacks that haven't ended yet.
+        """
+        playbacks = [playback for playback in self._playing.get(name, [])
+                     if not playback.done]
+        if playbacks:
+            self._playing[name] = playbacks
+        else:
+            self._playing.pop(name, None)
+        return playbacks
+
+    def is_playing(self, name: str) -> bool:
+        """Check whether a sound is playing or queued.
+
+        Arguments:
+            - name: file name of the sound.
+
+        Returns:
+            Whether any playback of the sound hasn't ended yet.
+        """
+        with self._lock:
+            return bool(self.playing(name))
+
+    def is_loading(self, name: str) -> bool:
+        """Check whether a trigger of a sound is waiting for its audio.
+
+        Arguments:
+            - name: file name of the sound.
+
+        Returns:
+            Whether the sound is being decoded for a trigger.
+        """
+        return name in self._loading
+
+    def stop(self, file: pathlib.Path) -> None:
+        """Stop all playbacks of a sound.
+
+        Arguments:
+            - file: path of the sound file.
+        """
+        with self._lock:
+            self._stop(file.name)
+
+    def stop_all(self) -> None:
+        """Stop everything that is playing or queued."""
+        with self._lock:
+            self._playing.clear()
+            for mixer in self.mixers.values():
+                mixer.stop_all()
+
+    def _voices(self, file: pathlib.Path, routes: list[tuple[utils.mixer.Mixer, float]],
+                pressed: float) -> concurrent.futures.Future[list[utils.mixer.Voice]]:
+        """Create one traced voice per route, sharing the decoded audio of the file.
+
+        The gain of every voice includes the gain normalizing the loudness of the file.
+        Files longer than the stream threshold by the library, or not scanned yet, are
+        streamed, so the file isn't touched here.
+        """
+        normalize = utils.library.LIBRARY.gain(file.name)
+        duration = utils.library.LIBRARY.duration(file.name)
+        if duration is None or duration > utils.config.CONFIG.stream_threshold:
+            return utils.stream.start(
+                file, [(mixer.audio_format, gain * normalize) for mixer, gain in routes],
+                functools.partial(self._report, file.name), pressed)
+        voices: concurrent.futures.Future[list[utils.mixer.Voice]] = concurrent.futures.Future()
+        audio_formats: list[utils.cache.Format] = list(dict.fromkeys(
+            mixer.audio_format for mixer, _ in routes))
+        decoded = utils.cache.CACHE.submit(file, audio_formats)
+
+        def create(decoded: concurrent.futures.Future[list[numpy.ndarray]]) -> None:
+            try:
+                data = dict(zip(audio_formats, decoded.result()))
+                voices.set_result(trace([utils.mixer.Voice(data[mixer.audio_format],
+                                                           gain * normalize)
+                                         for mixer, gain in routes], pressed))
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                voices.set_exception(exc)
+
+        decoded.add_done_callback(create)
+        return voices
+
+    def _report(self, name: str, error: Exception) -> None:
+        """Report an error of a streamed sound, ignored without a report callback."""
+        if self.report is not None:
+            self.report(name, error)
+
+    def _loaded(self, name: str) -> None:
+        """Count a trigger of a sound as no longer loading."""
+        with self._lock:
+            self._loading[name] -= 1
+            if not self._loading[name]:
+                del self._loading[name]
+
+    def _stop(self, name: str) -> None:
+        """Stop all playbacks of a sound, the lock must be held."""
+        for playback in self._playing.pop(name, []):
+            playback.stop()
+
+    def _choke(self, group: str) -> None:
+        """Stop all playbacks of sounds in a choke group, the lock must be held."""
+        for name in list(self._playing):
+            sound = utils.config.SOUNDS.get(name)
+            if sound is not None and sound.choke_group == group:
+                self._stop(name)
@@ -0,0 +1,167 @@
+"""Latency and stream statistics."""
+
+import bisect
+import json
+import pathlib
+import threading
+import time
+import typing
+
+EXPORT_PATH = "stats.json"
+# upper bin bounds in seconds, from 0.1 ms in steps of sqrt(2) up to about 74 s
+BOUNDS = tuple(0.0001 * 2 ** (index / 2) for index in range(40))
+STAGES = ("decode", "enqueue", "pickup", "output", "total")
+STATUS_FLAGS = ("input_underflow", "input_overflow", "output_underflow", "output_overflow",
+                "priming_output")
+
+
+class Trace:
+    """Timestamps of one voice from the press to its first sample at the device."""
+    __slots__ = ("pressed", "decoded", "enqueued", "started")
+
+    def __init__(self, pressed: float, decoded: float) -> None:
+        """Initialize the trace.
+
+        Arguments:
+            - pressed: when the button was pressed, from time.perf_counter.
+            - decoded: when the audio data was ready.
+        """
+        self.pressed = pressed
+        self.decoded = decoded
+        self.enqueued = 0.0  # when the voice was handed to the mixer
+        self.started = 0.0  # when the callback mixed its first frames
+
+
+class Histogram:
+    """Histogram with fixed logarithmic bins, cheap enough to fill from the callback."""
+    __slots__ = ("counts", "count", "total", "maximum")
+
+    def __init__(self) -> None:
+        """Initialize the histogram."""
+        self.counts = [0] * (len(BOUNDS) + 1)  # the last bin counts values above all bounds
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, value: float) -> None:
+        """Add a value.
+
+        Arguments:
+            - value: the value in seconds.
+        """
+        self.counts[bisect.bisect_left(BOUNDS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def percentile(self, fraction: float) -> float:
+        """Estimate a percentile by the upper bound of its bin, at most the maximum.
+
+        Arguments:
+            - fraction: the percentile as fraction, for example 0.95.
+
+        Returns:
+            The estimate in seconds, 0 if the histogram is empty.
+        """
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(BOUNDS[index], self.maximum) if index < len(BOUNDS) else self.maximum
+        return 0.0
+
+    def summary(self) -> dict[str, typing.Any]:
+        """Summarize the histogram.
+
+        Returns:
+            Count, mean, percentiles and maximum in milliseconds, and the non-empty bins.
+        """
+        return {"count": self.count,
+                "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+                "p50_ms": self.percentile(0.5) * 1000,
+                "p95_ms": self.percentile(0.95) * 1000,
+                "p99_ms": self.percentile(0.99) * 1000,
+                "max_ms": self.maximum * 1000,
+                "bins": [[BOUNDS[index] * 1000 if index < len(BOUNDS) else None, count]
+                         for index, count in enumerate(self.counts) if count]}
+
+
+class Stats:
+    """Latency histograms per stage and stream status counters per mixer.
+
+    Stages of a voice:
+        - decode: from the press until the audio data is ready.
+        - enqueue: until the scheduler handed the voice to the mixer.
+        - pickup: until the callback mixed its first frames, after the playback it's queued
+          behind and, for streamed voices, after the first block was decoded.
+        - output: until its first sample reaches the device, by the PortAudio timestamps.
+    Streamed voices are handed to the mixer before their first block is decoded, their
+    enqueue stage is 0.
+        - total: from the press until the first sample reaches the device.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the stats."""
+        self.histograms: dict[str, dict[str, Histogram]] = {}
+        self.status: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def mixer(self, name: str) -> tuple[dict[str, Histogram], dict[str, int]]:
+        """Get the histograms and status counters of a mixer, created on first use.
+
+        Arguments:
+            - name: name of the mixer.
+
+        Returns:
+            The histograms by stage and the counters by status flag.
+        """
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = {stage: Histogram() for stage in STAGES}
+                self.status[name] = dict.fromkeys(("callbacks", *STATUS_FLAGS), 0)
+            return self.histograms[name], self.status[name]
+
+    def summary(self) -> dict[str, typing.Any]:
+        """Summarize all stats.
+
+        Returns:
+            Histogram summaries and status counters by mixer.
+        """
+        return {name: {"stages": {stage: histogram.summary()
+                                  for stage, histogram in histograms.items()},
+                       "status": dict(self.status[name])}
+                for name, histograms in list(self.histograms.items())}
+
+    def export(self, path: str = EXPORT_PATH) -> pathlib.Path:
+        """Write all stats as JSON.
+
+        Arguments:
+            - path: path of the file.
+
+        Returns:
+            The path of the file.
+        """
+        file = pathlib.Path(path)
+        file.write_text(json.dumps({"time": time.time(), "mixers": self.summary()}, indent=4),
+                        encoding="utf-8")
+        return file
+
+
+def record(histograms: dict[str, Histogram], trace: Trace, output: float) -> None:
+    """Record the stages of a voice whose first sample was written, called from the callback.
+
+    Arguments:
+        - histograms: the histograms of the mixer.
+        - trace: the trace of the voice.
+        - output: when the first sample reaches the device, from time.perf_counter.
+    """
+    enqueued = max(trace.enqueued, trace.decoded)
+    histograms["decode"].add(trace.decoded - trace.pressed)
+    histograms["enqueue"].add(enqueued - trace.decoded)
+    histograms["pickup"].add(trace.started - enqueued)
+    histograms["output"].add(output - trace.started)
+    histograms["total"].add(output - trace.pressed)
+
+
+STATS = Stats()
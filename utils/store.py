@@ -0,0 +1,226 @@
+"""On-disk store of decoded audio, memory-mapped instead of decoded on later runs."""
+
+import hashlib
+import math
+import os
+import pathlib
+import struct
+import tempfile
+import typing
+
+import numpy
+import soundfile
+
+import utils.loudness
+import utils.resample
+
+STORE_PATH = "cache/"
+MAGIC = b"DION"
+VERSION = 1
+# magic, version, dtype, samplerate, channels, frames, source mtime, source size
+HEADER = struct.Struct("<4sHHIIQqQ")
+HEADER_SIZE = 64  # keeps the samples aligned
+ANALYSIS_BLOCKSIZE = 65536  # frames read at once when analysing a streamed file
+DTYPES: dict[int, numpy.dtype] = {0: numpy.dtype("<f4"), 1: numpy.dtype("<i2")}
+# peak and rms level and integrated loudness, None for silence
+Levels = tuple[float, float, typing.Optional[float]]
+
+
+class Header(typing.NamedTuple):
+    """Header of a stored file."""
+    dtype: int
+    samplerate: int
+    channels: int
+    frames: int
+    mtime: int
+    size: int
+
+
+def signature(file: pathlib.Path) -> tuple[int, int]:
+    """Get the signature of a sound file used to detect changes.
+
+    Arguments:
+        - file: path of the sound file.
+
+    Returns:
+        Modification time in nanoseconds and size in bytes.
+    """
+    stat = os.stat(file)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def path_for(file: pathlib.Path,
+             audio_format: typing.Optional[tuple[int, int]] = None) -> pathlib.Path:
+    """Get the path of the stored file for a sound file.
+
+    Arguments:
+        - file: path of the sound file.
+        - audio_format: samplerate and channels of a converted copy, None for the original.
+
+    Returns:
+        The path in the store.
+    """
+    digest = hashlib.sha1(str(file.resolve()).encode("utf-8")).hexdigest()
+    if audio_format is not None:
+        digest += f"_{audio_format[0]}_{audio_format[1]}"
+    return pathlib.Path(STORE_PATH, f"{digest}.pcm")
+
+
+def load(file: pathlib.Path, current: tuple[int, int],
+         audio_format: typing.Optional[tuple[int, int]] = None) \
+        -> typing.Optional[tuple[numpy.ndarray, int]]:
+    """Memory-map the stored audio of a sound file.
+
+    Arguments:
+        - file: path of the sound file.
+        - current: signature of the sound file, its modification time and size.
+        - audio_format: samplerate and channels of a converted copy, None for the original.
+
+    Returns:
+        The audio data and its samplerate, None if not stored or out of date.
+    """
+    path = path_for(file, audio_format)
+    try:
+        with path.open("rb") as stored:
+            raw = stored.read(HEADER.size)
+    except OSError:
+        return None
+    if len(raw) != HEADER.size:
+        return None
+    magic, version, *fields = HEADER.unpack(raw)
+    header = Header(*fields)
+    if magic != MAGIC or version != VERSION or header.dtype not in DTYPES \
+            or (header.mtime, header.size) != current:
+        return None
+    if header.frames == 0:
+        return numpy.zeros((0, header.channels), dtype=DTYPES[header.dtype]), header.samplerate
+    try:
+        data = numpy.memmap(path, dtype=DTYPES[header.dtype], mode="r", offset=HEADER_SIZE,
+                            shape=(header.frames, header.channels))
+    except (OSError, ValueError):
+        return None
+    return data, header.samplerate
+
+
+def save(file: pathlib.Path, current: tuple[int, int], data: numpy.ndarray,
+         samplerate: int, audio_format: typing.Optional[tuple[int, int]] = None) -> None:
+    """Store decoded audio of a sound file, replacing the stored file atomically.
+
+    Arguments:
+        - file: path of the sound file.
+        - current: signature of the sound file, its modification time and size.
+        - data: the audio data with shape (frames, channels).
+        - samplerate: samplerate of the audio data.
+        - audio_format: samplerate and channels of a converted copy, None for the original.
+    """
+    dtype = 1 if data.dtype == numpy.int16 else 0
+    path = path_for(file, audio_format)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    header = HEADER.pack(MAGIC, VERSION, dtype, samplerate, data.shape[1], data.shape[0],
+                         *current)
+    descriptor, temp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as stored:
+            stored.write(header.ljust(HEADER_SIZE, b"\0"))
+            numpy.ascontiguousarray(data, dtype=DTYPES[dtype]).tofile(stored)
+        os.replace(temp, path)
+    except BaseException:
+        pathlib.Path(temp).unlink(missing_ok=True)
+        raise
+
+
+def missing(file: pathlib.Path, audio_formats: list[typing.Optional[tuple[int, int]]],
+            dtype: str) -> list[typing.Optional[tuple[int, int]]]:
+    """Get the formats of a sound file that aren't stored or out of date.
+
+    Arguments:
+        - file: path of the sound file.
+        - audio_formats: samplerate and channels of converted copies, None for the original.
+        - dtype: sample format, "float32" or "int16".
+
+    Returns:
+        The formats that have to be built.
+    """
+    current = signature(file)
+    result = []
+    for audio_format in audio_formats:
+        stored = load(file, current, audio_format)
+        if stored is None or stored[0].dtype != dtype:
+            result.append(audio_format)
+    return result
+
+
+def levels(data: numpy.ndarray, samplerate: int) -> Levels:
+    """Measure the levels of audio data.
+
+    Arguments:
+        - data: float or int16 audio data.
+        - samplerate: samplerate of the audio data.
+
+    Returns:
+        Peak and rms level, linear with 1 as full scale, and the integrated loudness in LUFS,
+        None if silent.
+    """
+    samples = utils.resample.as_float(data)
+    if samples.size == 0:
+        return 0.0, 0.0, None
+    return (float(numpy.abs(samples).max()),
+            float(numpy.sqrt(numpy.mean(numpy.square(samples)))),
+            utils.loudness.integrated(samples, samplerate))
+
+
+def measure(file: str) -> Levels:
+    """Measure the levels of a sound file block by block, without keeping its audio data.
+
+    Runs in worker processes, for sound files that are streamed instead of stored.
+
+    Arguments:
+        - file: path of the sound file.
+
+    Returns:
+        Peak and rms level and loudness, like levels.
+    """
+    peak, squares, samples = 0.0, 0.0, 0
+    with soundfile.SoundFile(file) as sound:
+        meter = utils.loudness.Meter(sound.samplerate)
+        for block in sound.blocks(blocksize=ANALYSIS_BLOCKSIZE, dtype="float32",
+                                  always_2d=True):
+            flat = block.reshape(-1)
+            peak = max(peak, float(numpy.abs(flat).max(initial=0.0)))
+            squares += float(numpy.dot(flat, flat))
+            samples += flat.size
+            meter.add(block)
+    if samples == 0:
+        return 0.0, 0.0, None
+    return peak, math.sqrt(squares / samples), meter.result()
+
+
+def build(file: str, audio_formats: list[typing.Optional[tuple[int, int]]], dtype: str,
+          analyse: bool = False) -> typing.Optional[Levels]:
+    """Decode a sound file once and store it in every missing format.
+
+    Runs in worker processes, so it doesn't depend on the config or the library.
+
+    Arguments:
+        - file: path of the sound file.
+        - audio_formats: samplerate and channels of converted copies, None for the original.
+        - dtype: sample format, "float32" or "int16".
+        - analyse: whether to measure the levels, even if nothing has to be stored.
+
+    Returns:
+        Peak, rms level and loudness if analysed.
+    """
+    path = pathlib.Path(file)
+    todo = missing(path, audio_formats, dtype)
+    if not todo and not analyse:
+        return None
+    current = signature(path)
+    data, samplerate = soundfile.read(path, dtype=dtype, always_2d=True)
+    for audio_format in todo:
+        if audio_format is None:
+            save(path, current, data, samplerate)
+        else:
+            save(path, current,
+                 utils.resample.convert(data, samplerate, *audio_format, dtype=dtype),
+                 audio_format[0], audio_format)
+    return levels(data, samplerate) if analyse else None
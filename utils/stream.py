@@ -0,0 +1,174 @@
+"""Streaming playback of long sound files."""
+
+import concurrent.futures
+import pathlib
+import queue
+import threading
+import time
+import typing
+
+import numpy
+import soundfile
+
+import utils.mixer
+import utils.resample
+import utils.stats
+
+STREAM_BLOCKSIZE = 8192
+BUFFERED_BLOCKS = 8  # per voice, bounds the memory of a stream
+_END = numpy.zeros((0, 0), dtype=numpy.float32)
+
+class StreamingVoice(utils.mixer.Voice):
+    """Voice playing blocks fed by a reader thread through a bounded queue."""
+    __slots__ = ("audio_format", "_queue", "_block", "_offset", "_out", "_ended", "_fed")
+
+    def __init__(self, audio_format: tuple[int, int], gain: float) -> None:
+        """Initialize the voice.
+
+        Arguments:
+            - audio_format: samplerate and channels of the mixer.
+            - gain: linear gain applied to the audio data.
+        """
+        super().__init__(_END, gain)
+        self.audio_format = audio_format
+        self._queue: queue.Queue[numpy.ndarray] = queue.Queue(maxsize=BUFFERED_BLOCKS)
+        self._block = _END
+        self._offset = 0
+        self._out = numpy.zeros((utils.mixer.BLOCKSIZE, audio_format[1]), dtype=numpy.float32)
+        self._ended = False
+        self._fed = False
+
+    @property
+    def done(self) -> bool:
+        """Whether the voice has nothing left to play."""
+        return self.stopped or self._ended
+
+    def feed(self, block: numpy.ndarray, final: bool) -> bool:
+        """Queue a converted block, waiting while the queue is full.
+
+        Blocks are shared between all voices of the same format and never written to. The
+        first block counts as the decoded audio data of the trace.
+
+        Arguments:
+            - block: audio data in the format of the mixer with shape (frames, channels).
+            - final: whether this is the last block.
+
+        Returns:
+            False if the voice was stopped and doesn't need more blocks.
+        """
+        if self._out.shape[1] != block.shape[1]:  # mono stays mono, before the first block
+            self._out = numpy.zeros((len(self._out), block.shape[1]), dtype=numpy.float32)
+        if not self._fed:
+            self._fed = True
+            if self.trace is not None:
+                self.trace.decoded = time.perf_counter()
+        for queued in (block, _END) if final else (block,):
+            while not self.stopped:
+                try:
+                    self._queue.put(queued, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+        return not self.stopped
+
+    def read(self, frames: int) -> numpy.ndarray:
+        """Get the next frames to play, called from the callback.
+
+        Arguments:
+            - frames: number of frames requested.
+
+        Returns:
+            Up to frames frames of audio data, fewer if the reader falls behind.
+        """
+        if frames > len(self._out):
+            self._out = numpy.zeros((frames, self._out.shape[1]), dtype=numpy.float32)
+        filled = 0
+        while filled < frames:
+            if self._offset >= len(self._block):
+                try:
+                    self._block = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._offset = 0
+                if self._block is _END:
+                    self._ended = True
+                    break
+            count = min(frames - filled, len(self._block) - self._offset)
+            self._out[filled:filled + count] = self._block[self._offset:self._offset + count]
+            self._offset += count
+            filled += count
+        self.position += filled
+        return self._out[:filled]
+
+
+def read(file: pathlib.Path, voices: list[StreamingVoice],
+         opened: concurrent.futures.Future[list[utils.mixer.Voice]],
+         report: typing.Callable[[Exception], None]) -> None:
+    """Open a sound file, then decode it block by block and feed the blocks to voices.
+
+    Every block is converted once per audio format and shared by the voices of that format.
+    If decoding or converting fails, the voices are stopped and the error is reported.
+
+    Arguments:
+        - file: path of the sound file.
+        - voices: the voices to feed.
+        - opened: resolved with the voices once the file is open, or with the error.
+        - report: called with the error in the reader thread.
+    """
+    try:
+        sound = soundfile.SoundFile(file)
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        opened.set_exception(exc)
+        return
+    opened.set_result(list(voices))
+    resamplers: dict[tuple[int, int], utils.resample.StreamResampler] = {}
+    with sound:
+        try:
+            blocks = sound.blocks(blocksize=STREAM_BLOCKSIZE, dtype="float32",
+                                  always_2d=True)
+            block = next(blocks, None)
+            while block is not None and voices:
+                following = next(blocks, None)
+                converted: dict[tuple[int, int], numpy.ndarray] = {}
+                for audio_format in {voice.audio_format for voice in voices}:
+                    remixed = utils.resample.remix(block, audio_format[1])
+                    if audio_format not in resamplers:
+                        resamplers[audio_format] = utils.resample.StreamResampler(
+                            sound.samplerate, audio_format[0], remixed.shape[1])
+                    converted[audio_format] = resamplers[audio_format].process(
+                        remixed, following is None)
+                voices = [voice for voice in voices
+                          if voice.feed(converted[voice.audio_format], following is None)]
+                block = following
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            for voice in voices:
+                voice.stop()
+            report(exc)
+
+
+def start(file: pathlib.Path, routes: list[tuple[tuple[int, int], float]],
+          report: typing.Callable[[Exception], None],
+          pressed: typing.Optional[float] = None) \
+        -> concurrent.futures.Future[list[utils.mixer.Voice]]:
+    """Start decoding a sound file for streaming, playback starts with the first decoded block.
+
+    The file is opened and decoded once by one reader thread, whatever the number of routes.
+
+    Arguments:
+        - file: path of the sound file.
+        - routes: samplerate and channels of the mixer and gain of every voice.
+        - report: called with the error if decoding fails while playing.
+        - pressed: when the trigger was pressed, from time.perf_counter, to trace the
+          voices, their audio data is ready with the first block.
+
+    Returns:
+        A future of the new voices, one per route, to be added to the mixers. It's resolved
+        once the file is open, with the error if it can't be opened.
+    """
+    opened: concurrent.futures.Future[list[utils.mixer.Voice]] = concurrent.futures.Future()
+    voices = [StreamingVoice(audio_format, gain) for audio_format, gain in routes]
+    if pressed is not None:
+        for voice in voices:
+            voice.trace = utils.stats.Trace(pressed, pressed)
+    threading.Thread(target=read, args=(file, voices, opened, report), daemon=True).start()
+    return opened
@@ -2,27 +2,128 @@
 
 import json
 import pathlib
+import string
 import typing
 
 import utils.config
 
+LANG_PATH = "lang/"
+FALLBACK = "en"  # used for keys missing in a language
 
-def load_languages() -> dict[str, dict[str, str]]:
-    """Load all language files.
+FORMATTER = string.Formatter()
+
+# literal text followed by a field name, conversion and format spec, None for the trailing text
+Template = tuple[tuple[str, typing.Optional[str], typing.Optional[str], str], ...]
+
+
+def load_language(language: str) -> dict[str, str]:
+    """Load a language file.
+
+    Arguments:
+        - language: code of the language.
 
     Returns:
-        The text for all languages as dicts.
+        The text of the language as dict, empty if there is no such language.
     """
-    lang_maps: dict[str, dict[str, str]] = {}
-    for file in pathlib.Path("lang").iterdir():
-        lang_maps[file.name.removesuffix(".json")] = json.loads(
-            file.read_text("utf-8"))
-    return lang_maps
+    try:
+        return json.loads(pathlib.Path(LANG_PATH, f"{language}.json").read_text("utf-8"))
+    except FileNotFoundError:
+        return {}
+
+
+def compile_template(text: str) -> Template:
+    """Parse a format string once, so formatting doesn't parse it again.
+
+    Fields work like with str.format_map, with conversions, attributes, indexes and fields
+    nested in format specs. Positional fields are rejected, text is only formatted with
+    arguments by name.
+
+    Arguments:
+        - text: the format string.
+
+    Returns:
+        The parsed template, a ValueError is raised if it's invalid or has positional fields.
+    """
+    template = tuple((literal, field, conversion, spec or "")
+                     for literal, field, spec, conversion in FORMATTER.parse(text))
+    for _, field, conversion, spec in template:
+        if field is None:
+            continue
+        first = field.partition(".")[0].partition("[")[0]
+        if not first or first.isdigit():
+            raise ValueError(f"positional field {{{field}}} in {text!r}")
+        if conversion not in (None, "r", "s", "a"):
+            raise ValueError(f"unknown conversion !{conversion} in {text!r}")
+        compile_template(spec)  # nested fields
+    return template
+
+
+def format_field(field: str, conversion: typing.Optional[str], spec: str,
+                 format_args: dict[str, typing.Any]) -> str:
+    """Format one field of a template like str.format_map.
+
+    Arguments:
+        - field: name of the field, with attributes and indexes.
+        - conversion: "r", "s" or "a", None for none.
+        - spec: the format spec, may contain nested fields.
+        - format_args: arguments for formatting.
+
+    Returns:
+        The formatted value.
+    """
+    if field.isidentifier():
+        value = format_args[field]
+    else:
+        value = FORMATTER.get_field(field, (), format_args)[0]
+    if conversion is not None:
+        value = FORMATTER.convert_field(value, conversion)
+    if "{" in spec:
+        spec = spec.format_map(format_args)
+    return format(value, spec)
+
+
+class Catalog:
+    """Compiled translations of one language with fallback to English."""
+
+    def __init__(self, language: str) -> None:
+        """Initialize the catalog.
+
+        Arguments:
+            - language: code of the language.
+        """
+        self.language = language
+        texts = load_language(FALLBACK)
+        if language != FALLBACK:
+            texts |= load_language(language)
+        self.templates = {key: compile_template(text) for key, text in texts.items()}
+        self.resolved: dict[str, str] = {}  # text of keys used without format arguments
+
+    def get(self, key: str, format_args: dict[str, typing.Any]) -> str:
+        """Get the formatted text of a key.
+
+        Arguments:
+            - key: key to look for.
+            - format_args: arguments for formatting.
+
+        Returns:
+            The text if it exists, key otherwise.
+        """
+        if not format_args and key in self.resolved:
+            return self.resolved[key]
+        template = self.templates.get(key)
+        if template is None:
+            return key
+        text = "".join(literal if field is None
+                       else literal + format_field(field, conversion, spec, format_args)
+                       for literal, field, conversion, spec in template)
+        if not format_args:
+            self.resolved[key] = text
+        return text
 
 
 class Text:
     """Class for translatable text."""
-    lang_maps: dict[str, dict[str, str]] = load_languages()
+    catalog: typing.Optional[Catalog] = None  # of the configured language, loaded on first use
 
     @staticmethod
     def translatable(key: str, **format_args: typing.Any) -> str:
@@ -33,9 +134,22 @@ class Text:
             - **format_args: allows optional arguments for formatting.
 
         Returns:
-            The text if it exists, key otherwise.
+            The text in the configured language, in English if it isn't translated and the
+            key if it doesn't exist.
         """
-        if Text.lang_maps.get(utils.config.CONFIG.language) is not None \
-                and Text.lang_maps[utils.config.CONFIG.language].get(key) is not None:
-            return Text.lang_maps[utils.config.CONFIG.language][key].format_map(format_args)
-        return key
+        if Text.catalog is None:
+            Text.catalog = Catalog(utils.config.CONFIG.language)
+        return Text.catalog.get(key, format_args)
+
+
+def set_language(language: str) -> None:
+    """Switch to another language.
+
+    Mounted screens and widgets update their text when config_changed is published with
+    "language".
+
+    Arguments:
+        - language: code of the language.
+    """
+    if Text.catalog is None or Text.catalog.language != language:
+        Text.catalog = Catalog(language)
@@ -0,0 +1,118 @@
+"""Background warm-up of the sound library."""
+
+import concurrent.futures
+import multiprocessing
+import threading
+import typing
+
+import soundfile
+
+import utils.cache
+import utils.config
+import utils.library
+import utils.store
+
+CANCEL_INTERVAL = 0.1  # seconds between checks for a cancelled warm-up
+
+
+def classify(entries: list[utils.library.Metadata],
+             audio_formats: list[typing.Optional[utils.cache.Format]], dtype: str) \
+        -> tuple[list[utils.library.Metadata], list[utils.library.Metadata],
+                 list[utils.library.Metadata]]:
+    """Sort sound files by what the warm-up has to do, most recently and frequently used first.
+
+    Arguments:
+        - entries: metadata of the sound files.
+        - audio_formats: samplerate and channels of converted copies, None for the original.
+        - dtype: sample format, "float32" or "int16".
+
+    Returns:
+        The sounds that are stored and analysed, the sounds to be decoded and the streamed
+        sounds to be analysed, without the sounds that can't be read.
+    """
+    ready: list[utils.library.Metadata] = []
+    todo: list[utils.library.Metadata] = []
+    streamed: list[utils.library.Metadata] = []
+    for entry in sorted(entries, key=lambda entry: (entry.last_played, entry.plays),
+                        reverse=True):
+        if entry.samplerate == 0:
+            continue
+        if entry.duration > utils.config.CONFIG.stream_threshold:
+            if entry.peak is None:
+                streamed.append(entry)
+            continue
+        try:
+            missing = utils.store.missing(entry.path, audio_formats, dtype)
+        except OSError:
+            continue
+        (todo if missing or entry.peak is None else ready).append(entry)
+    return ready, todo, streamed
+
+
+def warm_up(entries: list[utils.library.Metadata], audio_formats: list[utils.cache.Format],
+            progress: typing.Callable[[int, int], None],
+            cancel: threading.Event) -> dict[str, str]:
+    """Decode, convert and analyse all sound files in a process pool and map them into the cache.
+
+    Sounds are handled most recently and frequently used first, sounds that can't be read
+    are skipped. Sounds that are streamed are only analysed, block by block. A sound that
+    fails in any other way is returned with its error and left to be decoded when it is
+    played, the other sounds are still warmed up.
+
+    Arguments:
+        - entries: metadata of the sound files.
+        - audio_formats: samplerate and channels of every mixer.
+        - progress: called with the number of finished and all files, not once cancelled.
+        - cancel: set to stop early, sounds that are being decoded are still finished.
+
+    Returns:
+        The errors of the sounds that failed by file name.
+    """
+    audio_formats = [None, *dict.fromkeys(audio_formats)]
+    dtype = utils.cache.CACHE.dtype
+    ready, todo, streamed = classify(entries, audio_formats, dtype)
+    total = len(ready) + len(todo) + len(streamed)
+    progress(len(ready), total)
+    errors: dict[str, str] = {}
+    if todo or streamed:
+        levels: dict[str, utils.store.Levels] = {}
+        # spawn, forking a process with audio and ui threads isn't safe
+        pool = concurrent.futures.ProcessPoolExecutor(
+            mp_context=multiprocessing.get_context("spawn"))
+        try:
+            futures = {pool.submit(utils.store.build, str(entry.path), audio_formats, dtype,
+                                   entry.peak is None): entry.name for entry in todo}
+            futures.update({pool.submit(utils.store.measure, str(entry.path)): entry.name
+                            for entry in streamed})
+            pending = set(futures)
+            while pending and not cancel.is_set():
+                done, pending = concurrent.futures.wait(
+                    pending, CANCEL_INTERVAL, concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        levels[futures[future]] = future.result()
+                    except (OSError, soundfile.LibsndfileError):
+                        pass  # reported when the sound is played
+                    except Exception as exc:  # pylint: disable=broad-exception-caught
+                        # like a crashed worker, which breaks the pool for the remaining
+                        # sounds, or workers killed with the process group while cancelling
+                        if not cancel.is_set():
+                            errors[futures[future]] = repr(exc)
+                if done and not cancel.is_set():
+                    progress(total - len(pending), total)
+        finally:
+            pool.shutdown(cancel_futures=True)
+        utils.library.LIBRARY.update_levels(
+            {name: level for name, level in levels.items() if level is not None})
+    for entry in ready + todo:
+        if cancel.is_set():
+            break
+        for audio_format in audio_formats[1:]:
+            try:
+                utils.cache.CACHE.get(entry.path, audio_format)
+            except (OSError, soundfile.LibsndfileError):
+                break
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                errors.setdefault(entry.name, repr(exc))
+                break
+    return errors
@@ -0,0 +1,63 @@
+"""Polling file watcher."""
+
+import os
+import pathlib
+import typing
+
+Signature = typing.Hashable  # of a file or directory, equal while it doesn't change
+
+
+def signature(path: pathlib.Path) -> Signature:
+    """Get the signature of a file, or of the files in a directory.
+
+    Arguments:
+        - path: path of the file or directory.
+
+    Returns:
+        Modification time and size of the file, or those of every file by name.
+    """
+    if not path.is_dir():
+        stat = path.stat()
+        return stat.st_mtime_ns, stat.st_size
+    with os.scandir(path) as scan:
+        return frozenset((item.name, stat.st_mtime_ns, stat.st_size)
+                         for item in scan for stat in (item.stat(),))
+
+
+class Watcher:
+    """Watcher comparing modification times and sizes of files and directories.
+
+    A directory changes when files in it are added, removed, renamed or written to. Its
+    mtime alone only covers the first three, a file overwritten in place keeps it.
+    """
+
+    def __init__(self, *paths: str) -> None:
+        """Initialize the watcher.
+
+        Arguments:
+            - paths: paths of the files and directories to watch.
+        """
+        self.paths = [pathlib.Path(path) for path in paths]
+        self.signatures = self._stat()
+
+    def _stat(self) -> list[typing.Optional[Signature]]:
+        """Get the signatures, None for missing paths."""
+        signatures: list[typing.Optional[Signature]] = []
+        for path in self.paths:
+            try:
+                signatures.append(signature(path))
+            except OSError:
+                signatures.append(None)
+        return signatures
+
+    def changed(self) -> list[pathlib.Path]:
+        """Get the paths that changed since the last call.
+
+        Returns:
+            The changed paths.
+        """
+        signatures = self._stat()
+        changed = [path for path, old, new in zip(self.paths, self.signatures, signatures)
+                   if old != new]
+        self.signatures = signatures
+        return changed
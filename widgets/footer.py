@@ -0,0 +1,130 @@
+"""Footer widget."""
+
+import typing
+
+import rich.text
+import textual.app
+import textual.containers
+import textual.screen
+import textual.widget
+
+import utils.translate
+
+if typing.TYPE_CHECKING:
+    import ui
+
+
+class Key(textual.widget.Widget):
+    """Key of a binding with its description, pressing the key when clicked."""
+    COMPONENT_CLASSES = {"key--key", "key--description"}
+    DEFAULT_CSS = """
+    Key {
+        width: auto;
+        height: 1;
+        background: $footer-item-background;
+        .key--key {
+            color: $footer-key-foreground;
+            background: $footer-key-background;
+            text-style: bold;
+        }
+        .key--description {
+            color: $footer-description-foreground;
+            background: $footer-description-background;
+        }
+        &:hover {
+            background: $block-hover-background;
+        }
+        &.-disabled {
+            text-style: dim;
+        }
+    }
+    """
+
+    def __init__(self, key: str, key_display: str, description: str, enabled: bool) -> None:
+        """Initialize the key.
+
+        Arguments:
+            - key: the bound key.
+            - key_display: the key as shown.
+            - description: the translated description.
+            - enabled: whether the action can run.
+        """
+        super().__init__(classes="" if enabled else "-disabled")
+        self.key = key
+        self.key_display = key_display
+        self.description = description
+        self.enabled = enabled
+
+    def render(self) -> rich.text.Text:
+        """Render the key and the description."""
+        text = rich.text.Text.assemble(
+            (f" {self.key_display} ", self.get_component_rich_style("key--key")),
+            (f"{self.description} ", self.get_component_rich_style("key--description")))
+        text.stylize_before(self.rich_style)
+        return text
+
+    def on_click(self) -> None:
+        """Press the key."""
+        if self.enabled:
+            self.app.simulate_key(self.key)
+        else:
+            self.app.bell()
+
+
+class Footer(textual.containers.ScrollableContainer, can_focus=False,
+             can_focus_children=False):
+    """Footer showing the active bindings, whose descriptions are translation keys.
+
+    The descriptions are translated when shown, so the bindings are declared once and
+    the footer only has to be composed again when the bindings or the language change.
+    """
+    DEFAULT_CSS = """
+    Footer {
+        layout: horizontal;
+        color: $footer-foreground;
+        background: $footer-background;
+        dock: bottom;
+        height: 1;
+        scrollbar-size: 0 0;
+    }
+    """
+
+    def compose(self) -> textual.app.ComposeResult:
+        """Compose the ui."""
+        if not self.is_attached:
+            return
+        actions: set[str] = set()
+        for key, (_, binding, enabled, _) in self.screen.active_bindings.items():
+            if binding.show and binding.action not in actions:
+                actions.add(binding.action)
+                yield Key(key, self.app.get_key_display(binding),
+                          utils.translate.Text.translatable(binding.description), enabled)
+
+    def on_mount(self) -> None:
+        """Follow binding and language changes."""
+        self.app: ui.SoundboardApp
+        self.screen.bindings_updated_signal.subscribe(self, self.bindings_changed)
+        self.app.config_changed.subscribe(self, self.config_changed)
+        self.call_next(self.recompose)
+
+    def on_unmount(self) -> None:
+        """Stop following binding changes."""
+        self.screen.bindings_updated_signal.unsubscribe(self)
+
+    async def bindings_changed(self, screen: textual.screen.Screen) -> None:
+        """Show the bindings again if they changed on this screen.
+
+        Arguments:
+            - screen: the screen whose bindings changed.
+        """
+        if screen is self.screen:
+            await self.recompose()
+
+    async def config_changed(self, changed: set[str]) -> None:
+        """Translate the descriptions again if the language changed.
+
+        Arguments:
+            - changed: names of the changed settings.
+        """
+        if "language" in changed:
+            await self.recompose()
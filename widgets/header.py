@@ -0,0 +1,34 @@
+"""Header widget."""
+
+import typing
+
+import textual.widgets
+
+import utils.config
+
+if typing.TYPE_CHECKING:
+    import ui
+
+
+class Header(textual.widgets.Header):
+    """Header showing the clock as configured, replaced when that setting changes."""
+
+    def __init__(self) -> None:
+        """Initialize the header."""
+        super().__init__(show_clock=utils.config.CONFIG.show_clock)
+
+    def on_mount(self) -> None:
+        """Follow config changes."""
+        self.app: ui.SoundboardApp
+        self.app.config_changed.subscribe(self, self.config_changed)
+
+    async def config_changed(self, changed: set[str]) -> None:
+        """Show or hide the clock with a new header if that setting changed.
+
+        Arguments:
+            - changed: names of the changed settings.
+        """
+        if "show_clock" in changed:
+            # the clock is only set up when the header is created
+            await self.screen.mount(Header(), before=self)
+            await self.remove()
@@ -1,47 +1,120 @@
 """Sound button widget."""
 
+import asyncio
 import pathlib
+import time
+import typing
 
 import textual.widgets
 
-import soundfile
-
-import main
 import utils.config
+import utils.library
 import utils.translate
 
+if typing.TYPE_CHECKING:
+    import ui
+
+POLL_INTERVAL = 0.05  # seconds between checks whether a sound has ended
+
 
 class SoundButton(textual.widgets.Button):
-    """Class for custom sound button."""
+    """Class for custom sound button.
 
-    def __init__(self, file: pathlib.Path) -> None:
+    Buttons are recycled by the sound grid, so the loading and playing state is read from
+    the scheduler for the sound the button currently shows.
+    """
+
+    def __init__(self, file: typing.Optional[pathlib.Path] = None,
+                 text: typing.Optional[str] = None, emoji: typing.Optional[str] = None) -> None:
         """Initialize the button.
 
         Arguments:
-            - file: path of the sound file.
+            - file: path of the sound file, the button is hidden without one.
+            - text: text of the sound, looked up in the sound config if not given.
+            - emoji: emoji of the sound, looked up in the sound config if not given.
+        """
+        super().__init__(classes="sound-button")
+        self.file: typing.Optional[pathlib.Path] = None
+        self.text = ""
+        self.emoji = ""
+        self.mode = 0
+        self.entry: typing.Optional[utils.library.Metadata] = None
+        self.show(file, text, emoji)
+
+    def bind(self, entry: typing.Optional[utils.library.Metadata], mode: int,
+             force: bool = False) -> None:
+        """Show another sound file, nothing is done if it didn't change.
+
+        Arguments:
+            - entry: metadata of the sound file, the button is hidden if None.
+            - mode: label mode, 0 for emoji and text, 1 for emoji only and 2 for text only.
+            - force: update the label even if the sound file didn't change.
+        """
+        if not force and mode == self.mode and entry == self.entry:
+            return
+        self.entry = entry
+        self.mode = mode
+        if entry is None:
+            self.show(None)
+        else:
+            self.show(entry.path, entry.text, entry.emoji)
+
+    def show(self, file: typing.Optional[pathlib.Path], text: typing.Optional[str] = None,
+             emoji: typing.Optional[str] = None) -> None:
+        """Show a sound file, looking up text and emoji in the sound config if not given.
+
+        Arguments:
+            - file: path of the sound file, the button is hidden if None.
+            - text: text of the sound.
+            - emoji: emoji of the sound.
         """
         self.file = file
-        self.text = file.stem
-        self.emoji = utils.config.CONFIG.default_emoji
-        file_name = file.stem + file.suffix
-        if utils.config.SOUNDS.get(file_name):
-            if utils.config.SOUNDS[file_name].text:
-                self.text = str(utils.config.SOUNDS[file_name].text)
-            if utils.config.SOUNDS[file_name].emoji:
-                self.emoji = str(utils.config.SOUNDS[file_name].emoji)
-        super().__init__(label=f"{self.emoji}\n{self.text}",
-                         classes="sound-button")
+        self.display = file is not None
+        if file is None:
+            return
+        if text is None:
+            text, emoji = utils.library.label(file.name)
+        self.text = text
+        self.emoji = emoji or utils.config.CONFIG.default_emoji
+        match self.mode:
+            case 0:
+                self.label = f"{self.emoji}\n{self.text}"
+            case 1:
+                self.label = self.emoji
+            case 2:
+                self.label = self.text
         self.tooltip = self.text
+        self.refresh_state()
+
+    def refresh_state(self) -> None:
+        """Show whether the sound is loading or playing."""
+        self.app: ui.SoundboardApp
+        if self.file is None or not self.is_attached or self.app.scheduler is None:
+            return
+        self.set_class(self.app.scheduler.is_loading(self.file.name), "-loading")
+        self.set_class(self.app.scheduler.is_playing(self.file.name), "-playing")
 
     def press(self) -> "SoundButton":
-        """Do something when button is pressed."""
+        """Do something when button is pressed, nothing until the audio devices are open."""
+        self.app: ui.SoundboardApp
+        if self.file is not None and self.app.scheduler is not None:
+            self.run_worker(self.play(self.file, time.perf_counter()), group="play")
+        return self
+
+    async def play(self, file: pathlib.Path, pressed: float) -> None:
+        """Trigger the sound without blocking the ui.
+
+        Arguments:
+            - file: path of the sound file.
+            - pressed: when the button was pressed, from time.perf_counter.
+        """
+        import soundfile  # pylint: disable=import-outside-toplevel
+        self.app: ui.SoundboardApp
+        assert self.app.scheduler is not None
         try:
-            self.app: main.SoundboardApp
-            data, samplerate = soundfile.read(file=self.file)
-            self.app.local_audio_queue.put((data, samplerate,
-                                            utils.config.CONFIG.output_device))
-            self.app.virtual_audio_queue.put((data, samplerate,
-                                              utils.config.CONFIG.virtual_output_device))
+            future = self.app.scheduler.trigger(file, pressed)
+            self.refresh_state()
+            await asyncio.wrap_future(future)
         except soundfile.LibsndfileError as exc:
             self.app.notify(message=exc.error_string,
                             title=exc.prefix.removesuffix(": "),
@@ -49,4 +122,5 @@ class SoundButton(textual.widgets.Button):
         except Exception as exc:  # pylint: disable=broad-exception-caught
             self.app.notify(message=str(exc), title=utils.translate.Text.translatable(
                 "notify.warning"), severity="warning")
-        return self
+        finally:
+            self.refresh_state()
@@ -0,0 +1,201 @@
+"""Sound grid widget."""
+
+import math
+
+import textual.app
+import textual.binding
+import textual.containers
+import textual.events
+
+import utils.library
+import widgets.sound_button
+
+ROW_HEIGHT = 4  # lines of a sound button, two label lines and the border
+COLUMNS = (5, 10, 5)  # by label mode
+EXTRA_ROWS = 2  # mounted beyond the fully visible rows, for partly visible rows
+
+
+class SoundGrid(textual.containers.ScrollableContainer):
+    """Scrollable grid that only mounts buttons for the visible rows and recycles them.
+
+    The cells are as high as all rows and padded down to the first mounted row, so the
+    scrollbar, the mouse wheel and the scroll keys cover all sound files. Focus moves
+    between sound files, not just the mounted buttons, and scrolls them into view.
+    """
+    BINDINGS = [
+        textual.binding.Binding("tab,right", "move(0, 1)", show=False),
+        textual.binding.Binding("shift+tab,left", "move(0, -1)", show=False),
+        textual.binding.Binding("down", "move(1, 0)", show=False),
+        textual.binding.Binding("up", "move(-1, 0)", show=False)
+    ]
+
+    def __init__(self, entries: list[utils.library.Metadata], id: str | None = None) \
+            -> None:  # pylint: disable=redefined-builtin
+        """Initialize the grid.
+
+        Arguments:
+            - entries: metadata of the sound files to show.
+            - id: id of the widget.
+        """
+        super().__init__(id=id)
+        self.entries = entries
+        self.mode = 0
+        self.rows = 0
+        self.first_row = 0
+        self.buttons: list[widgets.sound_button.SoundButton] = []
+        self.cells = textual.containers.Container(classes="cells")
+
+    @property
+    def columns(self) -> int:
+        """Number of columns in the current label mode."""
+        return COLUMNS[self.mode]
+
+    def compose(self) -> textual.app.ComposeResult:
+        """Compose the ui."""
+        yield self.cells
+
+    def on_mount(self) -> None:
+        """Start polling the state of the shown sounds and follow scrolling."""
+        self.set_interval(widgets.sound_button.POLL_INTERVAL, self.refresh_states)
+        self.watch(self, "scroll_y", self.scrolled, init=False)
+
+    def on_resize(self, event: textual.events.Resize) -> None:
+        """Adapt the number of buttons to the visible rows."""
+        self.rows = event.size.height // ROW_HEIGHT + EXTRA_ROWS
+        self.layout_buttons()
+
+    def scrolled(self, scroll_y: float) -> None:
+        """Show the rows scrolled to.
+
+        Arguments:
+            - scroll_y: the new scroll position in lines.
+        """
+        self.show_rows(int(scroll_y) // ROW_HEIGHT)
+
+    def action_move(self, rows: int, columns: int) -> None:
+        """Handle move action, focusing a neighbouring sound file."""
+        focused = self.app.focused
+        if isinstance(focused, widgets.sound_button.SoundButton) and focused in self.buttons:
+            index = self.first_row * self.columns + self.buttons.index(focused) \
+                + rows * self.columns + columns
+        else:
+            index = self.first_row * self.columns
+        self.focus_entry(max(0, min(index, len(self.entries) - 1)))
+
+    def focus_entry(self, index: int) -> None:
+        """Scroll the row of a sound file into view and focus its button.
+
+        Arguments:
+            - index: index of the sound file.
+        """
+        if not self.entries:
+            return
+        self.scroll_to_entry(index)
+        position = index - self.first_row * self.columns
+        if 0 <= position < len(self.buttons):
+            self.buttons[position].focus(scroll_visible=False)
+
+    def scroll_to_entry(self, index: int) -> None:
+        """Scroll just enough to show the whole row of a sound file.
+
+        The position is computed from the row, button regions are stale after rebinding.
+
+        Arguments:
+            - index: index of the sound file.
+        """
+        top = index // self.columns * ROW_HEIGHT
+        height = self.scrollable_content_region.height
+        if top < self.scroll_y:
+            self.scroll_to(y=top, animate=False, immediate=True)
+        elif top + ROW_HEIGHT > self.scroll_y + height:
+            self.scroll_to(y=top + ROW_HEIGHT - height, animate=False, immediate=True)
+        self.show_rows(int(self.scroll_y) // ROW_HEIGHT)
+
+    def set_mode(self, mode: int) -> None:
+        """Set the label mode, 0 for emoji and text, 1 for emoji only and 2 for text only.
+
+        Arguments:
+            - mode: the label mode.
+        """
+        first = self.first_row * self.columns
+        self.mode = mode
+        self.cells.styles.grid_size_columns = self.columns
+        self.layout_buttons()
+        self.scroll_to(y=first // self.columns * ROW_HEIGHT, animate=False, immediate=True)
+        self.show_rows(first // self.columns)
+
+    def set_entries(self, entries: list[utils.library.Metadata]) -> None:
+        """Replace the shown sound files, keeping the scroll position if possible.
+
+        Only buttons whose sound file was added, removed or relabeled are updated.
+
+        Arguments:
+            - entries: metadata of the sound files to show.
+        """
+        self.entries = entries
+        self.show_rows(self.first_row)
+
+    def relabel(self, names: set[str]) -> None:
+        """Update text and emoji of sound files after their sound config changed.
+
+        Arguments:
+            - names: file names of the changed sounds.
+        """
+        entries = []
+        for entry in self.entries:
+            if entry.name in names:
+                text, emoji = utils.library.label(entry.name)
+                entry = entry._replace(text=text, emoji=emoji)
+            entries.append(entry)
+        self.set_entries(entries)
+
+    def refresh_labels(self) -> None:
+        """Update the labels of all buttons, for example after the default emoji changed."""
+        for button in self.buttons:
+            button.bind(button.entry, self.mode, force=True)
+
+    def refresh_states(self) -> None:
+        """Show whether the shown sounds are loading or playing."""
+        for button in self.buttons:
+            button.refresh_state()
+
+    def layout_buttons(self) -> None:
+        """Mount or remove buttons so there is exactly one per mounted cell."""
+        wanted = self.rows * self.columns
+        if len(self.buttons) < wanted:
+            added = [widgets.sound_button.SoundButton() for _ in range(wanted - len(self.buttons))]
+            self.buttons.extend(added)
+            self.cells.mount(*added)
+        elif len(self.buttons) > wanted:
+            for button in self.buttons[wanted:]:
+                button.remove()
+            del self.buttons[wanted:]
+        self.show_rows(self.first_row)
+
+    def show_rows(self, row: int) -> None:
+        """Show the sound files starting at a row by rebinding the buttons.
+
+        The focus stays with the focused sound file while it is still shown.
+
+        Arguments:
+            - row: the first row to show, clamped to the available rows.
+        """
+        total_rows = math.ceil(len(self.entries) / self.columns)
+        self.first_row = max(0, min(row, total_rows - 1))
+        self.cells.styles.height = total_rows * ROW_HEIGHT
+        self.cells.styles.padding = (self.first_row * ROW_HEIGHT, 0, 0, 0)
+        focused = self.app.focused
+        if not isinstance(focused, widgets.sound_button.SoundButton) \
+                or focused not in self.buttons:
+            focused = None
+        entry = focused.entry if focused is not None else None
+        start = self.first_row * self.columns
+        for index, button in enumerate(self.buttons):
+            position = start + index
+            button.bind(self.entries[position] if position < len(self.entries) else None,
+                        self.mode)
+        if focused is not None and entry is not None and focused.entry != entry:
+            for button in self.buttons:
+                if button.entry == entry:
+                    button.focus(scroll_visible=False)
+                    break
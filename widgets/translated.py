@@ -0,0 +1,69 @@
+"""Translated text widgets."""
+
+import typing
+
+import textual.widgets
+
+import utils.translate
+
+if typing.TYPE_CHECKING:
+    import ui
+
+
+class Translated:
+    """Mixin for statics showing translated text, updated when the language changes.
+
+    What it uses of the static is declared here too.
+    """
+    key: str
+    format_args: dict[str, typing.Any]
+    app: "ui.SoundboardApp"
+    update: typing.Callable[..., None]
+
+    def on_mount(self) -> None:
+        """Follow language changes."""
+        self.app.config_changed.subscribe(typing.cast(textual.widgets.Static, self),
+                                          self.language_changed)
+
+    def language_changed(self, changed: set[str]) -> None:
+        """Translate again if the language changed.
+
+        Arguments:
+            - changed: names of the changed settings.
+        """
+        if "language" in changed:
+            self.update(utils.translate.Text.translatable(self.key, **self.format_args))
+
+
+class Static(Translated, textual.widgets.Static):
+    """Static showing translated text."""
+
+    def __init__(self, key: str, classes: typing.Optional[str] = None,
+                 **format_args: typing.Any) -> None:
+        """Initialize the static.
+
+        Arguments:
+            - key: key of the text.
+            - classes: css classes of the widget.
+            - **format_args: arguments for formatting.
+        """
+        super().__init__(utils.translate.Text.translatable(key, **format_args), classes=classes)
+        self.key = key
+        self.format_args = format_args
+
+
+class Label(Translated, textual.widgets.Label):
+    """Label showing translated text."""
+
+    def __init__(self, key: str, classes: typing.Optional[str] = None,
+                 **format_args: typing.Any) -> None:
+        """Initialize the label.
+
+        Arguments:
+            - key: key of the text.
+            - classes: css classes of the widget.
+            - **format_args: arguments for formatting.
+        """
+        super().__init__(utils.translate.Text.translatable(key, **format_args), classes=classes)
+        self.key = key
+        self.format_args = format_args